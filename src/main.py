@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from src.config import config
 from src.extensions import db, jwt
+from src.utils.json_provider import OrjsonProvider
 
 # Global scheduler instance - will be initialized lazily
 outreach_scheduler = None
@@ -17,6 +18,7 @@ outreach_scheduler = None
 def create_app(config_name=None):
     """Application factory pattern."""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Load configuration
     if config_name is None:
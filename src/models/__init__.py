@@ -10,6 +10,7 @@ from src.models.event import Event
 from src.models.webhook import Webhook
 from src.models.webhook_data import WebhookData
 from src.models.rate_usage import RateUsage
+from src.models.campaign_daily_stat import CampaignDailyStat
 
-__all__ = ['db', 'Client', 'LinkedInAccount', 'Campaign', 'Lead', 'Event', 'Webhook', 'WebhookData', 'RateUsage']
+__all__ = ['db', 'Client', 'LinkedInAccount', 'Campaign', 'Lead', 'Event', 'Webhook', 'WebhookData', 'RateUsage', 'CampaignDailyStat']
 
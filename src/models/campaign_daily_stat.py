@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Date, func, insert, select
+
+from src.extensions import db
+
+# Closed days the nightly job rebuilds on every run; rollup rows for older
+# days are never refreshed, so readers only trust rows within this window
+ROLLUP_REBUILD_DAYS = 7
+
+
+class CampaignDailyStat(db.Model):
+    """Per-campaign event counts rolled up by day and event type.
+
+    Rows are rebuilt for closed days by the nightly scheduler job; analytics
+    endpoints read them instead of rescanning the events table.
+    """
+    __tablename__ = 'campaign_daily_stats'
+
+    campaign_id = db.Column(db.String(36), db.ForeignKey('campaigns.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+    event_type = db.Column(db.String(50), primary_key=True)
+    n = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def refresh(cls, start_day: date, end_day: Optional[date] = None) -> int:
+        """Rebuild the rollup for every campaign for days in [start_day, end_day).
+
+        A day is always rebuilt for all campaigns at once, so any row for a
+        day means the whole day has been rolled up.
+        """
+        from src.models.lead import Lead
+        from src.models.event import Event
+
+        end_day = end_day or date.today()
+        start_ts = datetime.combine(start_day, datetime.min.time())
+        end_ts = datetime.combine(end_day, datetime.min.time())
+
+        event_day = func.date(Event.timestamp, type_=Date)
+        rollup = (
+            select(Lead.campaign_id, event_day, Event.event_type, func.count(Event.id))
+            .join(Lead, Event.lead_id == Lead.id)
+            .where(Event.timestamp >= start_ts, Event.timestamp < end_ts)
+            .group_by(Lead.campaign_id, event_day, Event.event_type)
+        )
+
+        db.session.query(cls).filter(cls.day >= start_day, cls.day < end_day).delete(synchronize_session=False)
+        result = db.session.execute(
+            insert(cls).from_select(['campaign_id', 'day', 'event_type', 'n'], rollup)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    def to_dict(self):
+        return {
+            'campaign_id': self.campaign_id,
+            'day': self.day.isoformat(),
+            'event_type': self.event_type,
+            'n': self.n
+        }
+
+    def __repr__(self):
+        return f'<CampaignDailyStat {self.campaign_id} {self.day} {self.event_type}={self.n}>'
@@ -3,6 +3,9 @@ from datetime import datetime
 from src.models import db
 from sqlalchemy import UniqueConstraint, JSON
 
+# meta_json source of leads imported from 1st-level connections
+FIRST_LEVEL_SOURCE = 'first_level_connections'
+
 
 class Lead(db.Model):
     __tablename__ = 'leads'
@@ -46,25 +46,14 @@ def create_performance_indexes():
             'description': 'Index for scheduler queries based on last step sent'
         },
         
-        # Event table indexes
-        {
-            'name': 'ix_events_lead_timestamp',
-            'table': 'events',
-            'columns': ['lead_id', 'timestamp'],
-            'description': 'Index for event queries by lead and time'
-        },
+        # Event table indexes (lead/time and time-window lookups use the covering
+        # indexes in create_composite_indexes)
         {
             'name': 'ix_events_type_timestamp',
             'table': 'events',
             'columns': ['event_type', 'timestamp'],
             'description': 'Index for event type filtering with time'
         },
-        {
-            'name': 'ix_events_timestamp',
-            'table': 'events',
-            'columns': ['timestamp'],
-            'description': 'Index for time-based event queries'
-        },
         
         # Campaign table indexes
         {
@@ -168,6 +157,20 @@ def create_composite_indexes():
             'description': 'Composite index for scheduler lead processing'
         },
         
+        {
+            'name': 'ix_leads_campaign_status_created',
+            'table': 'leads',
+            'columns': ['campaign_id', 'status', 'created_at'],
+            'description': 'Covering index for per-campaign lead status counts split by creation date'
+        },
+        
+        {
+            'name': 'ix_leads_campaign_created_status',
+            'table': 'leads',
+            'columns': ['campaign_id', 'created_at', 'status'],
+            'description': 'Covering index for the per-day analytics CSV export'
+        },
+        
         # Analytics queries
         {
             'name': 'ix_events_analytics',
@@ -176,6 +179,34 @@ def create_composite_indexes():
             'description': 'Composite index for analytics queries'
         },
         
+        {
+            'name': 'ix_events_lead_timestamp_type',
+            'table': 'events',
+            'columns': ['lead_id', 'timestamp', 'event_type'],
+            'description': 'Event queries by lead and time; covers per-campaign event scans via lead_id semi-joins'
+        },
+        
+        {
+            'name': 'ix_events_lead_type_timestamp',
+            'table': 'events',
+            'columns': ['lead_id', 'event_type', 'timestamp DESC'],
+            'description': 'Per-lead latest event of each type for the leads CSV export'
+        },
+        
+        {
+            'name': 'ix_events_timestamp_type_lead',
+            'table': 'events',
+            'columns': ['timestamp', 'event_type', 'lead_id'],
+            'description': 'Time-window event queries; covers counts by type and the join to leads'
+        },
+        
+        {
+            'name': 'ix_events_meta_account_timestamp',
+            'table': 'events',
+            'columns': ["(meta_json->>'linkedin_account_id')", 'timestamp DESC'],
+            'description': 'Expression index for per-account event lookups in the rate usage fallback'
+        },
+        
         # Campaign status queries
         {
             'name': 'ix_campaigns_analytics',
@@ -187,35 +218,37 @@ def create_composite_indexes():
     
     created_count = 0
     
-    for index in composite_indexes:
-        try:
-            # Check if index already exists
-            check_sql = f"""
-            SELECT 1 FROM pg_indexes 
-            WHERE indexname = '{index['name']}' 
-            AND tablename = '{index['table']}'
-            """
-            
-            result = db.session.execute(text(check_sql)).fetchone()
-            
-            if result:
-                logger.info(f"Composite index {index['name']} already exists, skipping")
-                continue
-            
-            # Create composite index
-            columns_str = ', '.join(index['columns'])
-            create_sql = f"""
-            CREATE INDEX CONCURRENTLY {index['name']} 
-            ON {index['table']} ({columns_str})
-            """
-            
-            db.session.execute(text(create_sql))
-            db.session.commit()
-            logger.info(f"Created composite index {index['name']} on {index['table']} ({columns_str})")
-            created_count += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to create composite index {index['name']}: {str(e)}")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so the
+    # composite indexes are built on an autocommit connection
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        for index in composite_indexes:
+            try:
+                # Check if index already exists
+                check_sql = f"""
+                SELECT 1 FROM pg_indexes 
+                WHERE indexname = '{index['name']}' 
+                AND tablename = '{index['table']}'
+                """
+                
+                result = connection.execute(text(check_sql)).fetchone()
+                
+                if result:
+                    logger.info(f"Composite index {index['name']} already exists, skipping")
+                    continue
+                
+                # Create composite index
+                columns_str = ', '.join(index['columns'])
+                create_sql = f"""
+                CREATE INDEX CONCURRENTLY {index['name']} 
+                ON {index['table']} ({columns_str})
+                """
+                
+                connection.execute(text(create_sql))
+                logger.info(f"Created composite index {index['name']} on {index['table']} ({columns_str})")
+                created_count += 1
+                
+            except Exception as e:
+                logger.error(f"Failed to create composite index {index['name']}: {str(e)}")
     
     logger.info(f"Composite index creation complete: {created_count} created")
     return created_count
@@ -1,7 +1,7 @@
 import logging
 import time
 from datetime import datetime, timedelta
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from sqlalchemy import inspect, text, func
 
@@ -9,6 +9,7 @@ from src.extensions import db
 from src.services.scheduler import get_outreach_scheduler
 from src.services.caching import get_cache_service
 from src.models import Lead, Event, Campaign, Client, LinkedInAccount, WebhookData
+from src.models.campaign_daily_stat import ROLLUP_REBUILD_DAYS
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,7 @@ def migrations_bootstrap():
 
     - Adds leads.conversation_id if missing
     - Creates rate_usage table if missing
+    - Creates campaign_daily_stats table if missing
     """
     try:
         inspector = inspect(db.engine)
@@ -78,6 +80,22 @@ def migrations_bootstrap():
             db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_rate_usage_date ON rate_usage(usage_date)"))
             changes.append("created rate_usage table and indexes")
 
+        # Ensure campaign_daily_stats rollup table exists
+        if "campaign_daily_stats" not in tables:
+            db.session.execute(text(
+                """
+                CREATE TABLE campaign_daily_stats (
+                  campaign_id VARCHAR(36) NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+                  day DATE NOT NULL,
+                  event_type VARCHAR(50) NOT NULL,
+                  n INTEGER NOT NULL DEFAULT 0,
+                  PRIMARY KEY (campaign_id, day, event_type)
+                );
+                """
+            ))
+            db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_campaign_daily_stats_day ON campaign_daily_stats(day)"))
+            changes.append("created campaign_daily_stats table and indexes")
+
         db.session.commit()
         return jsonify({
             "message": "Bootstrap migrations applied",
@@ -118,6 +136,30 @@ def backfill_rate_usage():
         return jsonify({"error": str(e)}), 500
 
 
+@admin_bp.route("/backfill/campaign-stats", methods=["POST"])
+# @jwt_required()  # Temporarily removed for development
+def backfill_campaign_stats():
+    """Rebuild the campaign daily stats rollup for the last N closed days.
+    
+    Timeseries only read rollup rows the nightly job still rebuilds, so N is
+    capped at ROLLUP_REBUILD_DAYS.
+    """
+    try:
+        days = request.args.get('days', ROLLUP_REBUILD_DAYS, type=int)
+        if not 1 <= days <= ROLLUP_REBUILD_DAYS:
+            return jsonify({"error": f"days must be between 1 and {ROLLUP_REBUILD_DAYS}"}), 400
+        scheduler = get_outreach_scheduler()
+        if not scheduler:
+            return jsonify({"error": "scheduler unavailable"}), 500
+        # Execute synchronously
+        rows = scheduler._run_campaign_stats_rollup(days)
+        if rows is None:
+            return jsonify({"error": "Campaign stats rollup failed"}), 500
+        return jsonify({"message": f"Campaign stats rollup for the last {days} days completed", "rows": rows}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 # Performance Optimization Endpoints
 
 @admin_bp.route("/performance/optimize-database", methods=["POST"])
@@ -13,12 +13,27 @@ from datetime import datetime, timedelta, date
 from typing import List, Dict, Any
 from flask import jsonify, request, current_app
 from sqlalchemy import func, and_, or_, desc, asc
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, raiseload
 
 from src.extensions import db
 from src.models import Campaign, Lead, Event, LinkedInAccount, Client
 from src.models.rate_usage import RateUsage
-from .core import _calculate_conversion_funnel, _calculate_time_based_analytics, _calculate_predictive_analytics
+from src.models.campaign_daily_stat import CampaignDailyStat, ROLLUP_REBUILD_DAYS
+from src.services.caching import cache_response, CACHE_CONFIG
+from .core import (
+    _daterange,
+    _day_window,
+    _day_windows,
+    _sql_date,
+    _campaign_lead_ids,
+    _first_level_lead_filter,
+    _first_level_lead_ids,
+    _lead_status_counts,
+    _lead_metrics,
+    _calculate_conversion_funnel,
+    _calculate_time_based_analytics,
+    _calculate_predictive_analytics,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +42,7 @@ from . import analytics_bp
 
 
 @analytics_bp.route("/campaigns/<campaign_id>/summary", methods=["GET"])
+@cache_response('analytics:campaign_summary', ttl=CACHE_CONFIG['analytics']['campaign'], key_args=['campaign_id'])
 def campaign_summary(campaign_id):
     """Get comprehensive analytics summary for a campaign."""
     try:
@@ -35,33 +51,37 @@ def campaign_summary(campaign_id):
         if not campaign:
             return jsonify({'error': 'Campaign not found'}), 404
         
-        # Get basic campaign stats
-        leads = Lead.query.filter_by(campaign_id=campaign_id).all()
-        total_leads = len(leads)
+        # One reference time for every window in the summary
+        now = datetime.utcnow()
         
-        # Calculate status breakdown
-        status_counts = {}
-        for lead in leads:
-            status = lead.status
-            status_counts[status] = status_counts.get(status, 0) + 1
+        # Calculate status breakdown in SQL rather than loading every lead,
+        # along with the breakdown of leads added in the last 30 days
+        status_counts, recent_status_counts = _lead_status_counts(
+            campaign_id, recent_since=now - timedelta(days=30)
+        )
+        total_leads = sum(status_counts.values())
         
-        # Get recent events
-        recent_events = Event.query.join(Lead).filter(
-            Lead.campaign_id == campaign_id,
-            Event.timestamp >= datetime.utcnow() - timedelta(days=7)
-        ).order_by(desc(Event.timestamp)).limit(10).all()
+        # Get recent events (a campaign without leads has none); only event
+        # columns are serialized, so any relationship load is a bug
+        recent_events = Event.query.options(raiseload('*')).filter(
+            Event.lead_id.in_(_campaign_lead_ids(campaign_id)),
+            Event.timestamp >= now - timedelta(days=7)
+        ).order_by(desc(Event.timestamp)).limit(10).all() if total_leads else []
         
-        # Calculate conversion funnel
-        conversion_funnel = _calculate_conversion_funnel(campaign_id)
+        # Calculate conversion funnel for leads added in the last 30 days
+        conversion_funnel = _calculate_conversion_funnel(recent_status_counts)
         
         # Calculate time-based analytics
-        time_analytics = _calculate_time_based_analytics(campaign_id)
+        time_analytics = _calculate_time_based_analytics(campaign_id, now=now)
         
         # Calculate predictive analytics
-        predictive_analytics = _calculate_predictive_analytics(campaign_id)
+        predictive_analytics = _calculate_predictive_analytics(campaign, status_counts, now=now)
         
-        # Get LinkedIn account info
-        linkedin_account = LinkedInAccount.query.filter_by(
+        # Get LinkedIn account info (only the two columns the summary shows)
+        linkedin_account = db.session.query(
+            LinkedInAccount.account_id,
+            LinkedInAccount.status
+        ).filter_by(
             client_id=campaign.client_id,
             status='connected'
         ).first()
@@ -104,6 +124,7 @@ def campaign_summary(campaign_id):
 
 
 @analytics_bp.route("/campaigns/<campaign_id>/timeseries", methods=["GET"])
+@cache_response('analytics:campaign_timeseries', ttl=CACHE_CONFIG['analytics']['campaign'], key_args=['campaign_id'])
 def campaign_timeseries(campaign_id):
     """Get timeseries data for a campaign."""
     try:
@@ -120,36 +141,61 @@ def campaign_timeseries(campaign_id):
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Build query
-        query = Event.query.join(Lead).filter(
-            Lead.campaign_id == campaign_id,
-            Event.timestamp >= start_date
+        # Closed days the nightly job still rebuilds come from the daily
+        # rollup; a day with any rollup row has been rolled up for every
+        # campaign. Older rows are never refreshed, so those days are counted
+        # live like today
+        days_in_range = _daterange(days)
+        today = date.today()
+        rolled_up_days = {
+            day for (day,) in db.session.query(CampaignDailyStat.day).filter(
+                CampaignDailyStat.day >= today - timedelta(days=min(days - 1, ROLLUP_REBUILD_DAYS)),
+                CampaignDailyStat.day < today
+            ).distinct()
+        }
+        
+        buckets = {}
+        if rolled_up_days:
+            stats_query = CampaignDailyStat.query.filter(
+                CampaignDailyStat.campaign_id == campaign_id,
+                CampaignDailyStat.day.in_(rolled_up_days)
+            )
+            if event_type:
+                stats_query = stats_query.filter(CampaignDailyStat.event_type == event_type)
+            for stat in stats_query.all():
+                buckets.setdefault(stat.day, {})[stat.event_type] = stat.n
+        
+        # Count the remaining days (at least today) live in SQL, one timestamp
+        # range per run of consecutive days so rolled-up days are never scanned
+        live_days = [day for day in days_in_range if day not in rolled_up_days] or [today]
+        event_day = _sql_date(Event.timestamp).label('day')
+        query = db.session.query(
+            event_day,
+            Event.event_type,
+            func.count(Event.id)
+        ).filter(
+            Event.lead_id.in_(_campaign_lead_ids(campaign_id)),
+            or_(*(
+                and_(Event.timestamp >= start, Event.timestamp < end)
+                for start, end in _day_windows(live_days)
+            ))
         )
         
         if event_type:
             query = query.filter(Event.event_type == event_type)
         
-        events = query.order_by(asc(Event.timestamp)).all()
-        
-        # Bucket events by day
-        buckets = _bucket_events_by_day(events)
+        for day, day_event_type, count in query.group_by(event_day, Event.event_type).all():
+            buckets.setdefault(day, {})[day_event_type] = count
         
         # Generate timeseries data
-        timeseries_data = []
-        for day in _daterange(days):
-            day_events = buckets.get(day, [])
-            
-            # Count by event type
-            event_counts = {}
-            for event in day_events:
-                event_type = event.event_type
-                event_counts[event_type] = event_counts.get(event_type, 0) + 1
-            
-            timeseries_data.append({
+        timeseries_data = [
+            {
                 'date': day.isoformat(),
-                'total_events': len(day_events),
-                'event_breakdown': event_counts
-            })
+                'total_events': sum(buckets.get(day, {}).values()),
+                'event_breakdown': buckets.get(day, {})
+            }
+            for day in days_in_range
+        ]
         
         return jsonify({
             'campaign_id': campaign_id,
@@ -173,36 +219,29 @@ def campaign_first_level_connections(campaign_id):
         if not campaign:
             return jsonify({'error': 'Campaign not found'}), 404
         
-        # Get first-level connection leads
-        first_level_leads = Lead.query.filter(
+        # Get first-level connection status counts
+        first_level_status_counts = dict(db.session.query(Lead.status, func.count(Lead.id)).filter(
             Lead.campaign_id == campaign_id,
-            getattr(Lead, 'connection_type', None) == '1st Level'
-        ).all()
+            _first_level_lead_filter()
+        ).group_by(Lead.status).all())
         
         # Calculate metrics
-        total_first_level = len(first_level_leads)
-        connected_first_level = len([l for l in first_level_leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-        responded_first_level = len([l for l in first_level_leads if l.status in ['responded', 'completed']])
-        
-        # Calculate rates
-        connection_rate = (connected_first_level / total_first_level * 100) if total_first_level > 0 else 0
-        response_rate = (responded_first_level / total_first_level * 100) if total_first_level > 0 else 0
+        metrics = _lead_metrics(first_level_status_counts)
         
         # Get recent first-level events
-        recent_events = Event.query.join(Lead).filter(
-            Lead.campaign_id == campaign_id,
-            getattr(Lead, 'connection_type', None) == '1st Level',
+        recent_events = Event.query.options(raiseload('*')).filter(
+            Event.lead_id.in_(_first_level_lead_ids(campaign_id)),
             Event.timestamp >= datetime.utcnow() - timedelta(days=7)
         ).order_by(desc(Event.timestamp)).limit(10).all()
         
         return jsonify({
             'campaign_id': campaign_id,
             'metrics': {
-                'total_first_level_leads': total_first_level,
-                'connected_first_level': connected_first_level,
-                'responded_first_level': responded_first_level,
-                'connection_rate': round(connection_rate, 2),
-                'response_rate': round(response_rate, 2)
+                'total_first_level_leads': metrics['total_leads'],
+                'connected_first_level': metrics['connected_leads'],
+                'responded_first_level': metrics['responded_leads'],
+                'connection_rate': metrics['connection_rate'],
+                'response_rate': metrics['response_rate']
             },
             'recent_events': [
                 {
@@ -233,28 +272,62 @@ def account_rate_usage(linkedin_account_id):
         
         # Get rate usage data
         usage_records = RateUsage.query.filter(
-            RateUsage.provider_account_id == linkedin_account_id,
-            RateUsage.date >= start_date,
-            RateUsage.date <= end_date
-        ).order_by(asc(RateUsage.date)).all()
+            RateUsage.linkedin_account_id == linkedin_account_id,
+            RateUsage.usage_date >= start_date,
+            RateUsage.usage_date <= end_date
+        ).order_by(asc(RateUsage.usage_date)).all()
+        
+        # Fall back to the event log when no usage rows exist for the window
+        # (e.g. activity recorded before the rate_usage table was introduced).
+        # The sender account is extracted from meta_json in SQL so the JSON
+        # blob is never materialized in Python.
+        event_counts = {}
+        if not usage_records:
+            sender_account = Event.meta_json['linkedin_account_id'].as_string()
+            window_start, window_end = _day_window(start_date, end_date)
+            event_day = _sql_date(Event.timestamp).label('day')
+            event_counts = {
+                (day, event_type): count
+                for day, event_type, count in db.session.query(
+                    event_day,
+                    Event.event_type,
+                    func.count(Event.id)
+                ).filter(
+                    sender_account == linkedin_account_id,
+                    Event.event_type.in_(['connection_request_sent', 'message_sent']),
+                    Event.timestamp >= window_start,
+                    Event.timestamp < window_end
+                ).group_by(event_day, Event.event_type).all()
+            }
         
-        # Generate daily usage data
+        # Index usage records by day (one row per account and day)
+        usage_by_date = {record.usage_date: record for record in usage_records}
+        
+        # Generate daily usage data, totalling it as we go
         daily_usage = []
+        total_connections = 0
+        total_messages = 0
         for day in _daterange(days):
             # Find usage record for this day
-            usage_record = next((r for r in usage_records if r.date == day), None)
+            usage_record = usage_by_date.get(day)
+            
+            if usage_record:
+                connections_sent = usage_record.invites_sent
+                messages_sent = usage_record.messages_sent
+            else:
+                connections_sent = event_counts.get((day, 'connection_request_sent'), 0)
+                messages_sent = event_counts.get((day, 'message_sent'), 0)
             
             daily_usage.append({
                 'date': day.isoformat(),
-                'connections_sent': usage_record.connections_sent if usage_record else 0,
-                'messages_sent': usage_record.messages_sent if usage_record else 0,
-                'total_actions': (usage_record.connections_sent + usage_record.messages_sent) if usage_record else 0
+                'connections_sent': connections_sent,
+                'messages_sent': messages_sent,
+                'total_actions': connections_sent + messages_sent
             })
+            total_connections += connections_sent
+            total_messages += messages_sent
         
-        # Calculate totals
-        total_connections = sum(day['connections_sent'] for day in daily_usage)
-        total_messages = sum(day['messages_sent'] for day in daily_usage)
-        total_actions = sum(day['total_actions'] for day in daily_usage)
+        total_actions = total_connections + total_messages
         
         return jsonify({
             'linkedin_account_id': linkedin_account_id,
@@ -8,13 +8,17 @@ This module contains functionality for:
 """
 
 import logging
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from flask import jsonify, request, current_app
-from sqlalchemy import func, and_, or_, desc, asc
+from sqlalchemy import func, and_, or_, desc, asc, select, case
 
 from src.extensions import db
 from src.models import Campaign, Lead, Event, Client
+from src.services.caching import cache_response, CACHE_CONFIG
+from src.utils.lead_statuses import CONNECTED_STATUSES, RESPONDED_STATUSES
+from .core import _lead_metrics, _lead_rates
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,34 @@ logger = logging.getLogger(__name__)
 from . import analytics_bp
 
 
+def _campaign_status_counts(start_date, client_id=None):
+    """Count leads created since start_date per campaign and status in one query."""
+    query = db.session.query(
+        Lead.campaign_id,
+        Lead.status,
+        func.count(Lead.id)
+    ).filter(Lead.created_at >= start_date)
+    
+    if client_id is not None:
+        query = query.filter(
+            Lead.campaign_id.in_(select(Campaign.id).where(Campaign.client_id == client_id))
+        )
+    
+    counts = defaultdict(Counter)
+    for campaign_id, status, count in query.group_by(Lead.campaign_id, Lead.status).all():
+        counts[campaign_id][status] = count
+    return counts
+
+
+def _lead_metric_columns():
+    """SQL aggregates for total, connected and responded lead counts."""
+    return (
+        func.count(Lead.id).label('total_leads'),
+        func.coalesce(func.sum(case((Lead.status.in_(CONNECTED_STATUSES), 1), else_=0)), 0).label('connected_leads'),
+        func.coalesce(func.sum(case((Lead.status.in_(RESPONDED_STATUSES), 1), else_=0)), 0).label('responded_leads')
+    )
+
+
 @analytics_bp.route('/clients/<client_id>/comparative-analytics', methods=['GET'])
 def client_comparative_analytics(client_id):
     """Get comparative analytics for a specific client across all their campaigns."""
@@ -38,51 +70,25 @@ def client_comparative_analytics(client_id):
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Get all campaigns for this client
-        campaigns = Campaign.query.filter_by(client_id=client_id).all()
+        # Get all campaigns for this client (only the columns reported below)
+        campaigns = db.session.query(
+            Campaign.id, Campaign.name, Campaign.status
+        ).filter(Campaign.client_id == client_id).all()
+        
+        # Count every campaign's leads per status in one grouped query
+        status_counts = _campaign_status_counts(start_date, client_id=client_id)
         
         campaign_analytics = []
         for campaign in campaigns:
-            # Get leads for this campaign
-            leads = Lead.query.filter(
-                Lead.campaign_id == campaign.id,
-                Lead.created_at >= start_date
-            ).all()
-            
-            # Calculate metrics
-            total_leads = len(leads)
-            connected_leads = len([l for l in leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-            responded_leads = len([l for l in leads if l.status in ['responded', 'completed']])
-            
-            # Calculate rates
-            connection_rate = (connected_leads / total_leads * 100) if total_leads > 0 else 0
-            response_rate = (responded_leads / total_leads * 100) if total_leads > 0 else 0
-            
             campaign_analytics.append({
                 'campaign_id': campaign.id,
                 'campaign_name': campaign.name,
                 'campaign_status': campaign.status,
-                'metrics': {
-                    'total_leads': total_leads,
-                    'connected_leads': connected_leads,
-                    'responded_leads': responded_leads,
-                    'connection_rate': round(connection_rate, 2),
-                    'response_rate': round(response_rate, 2)
-                }
+                'metrics': _lead_metrics(status_counts.get(campaign.id, Counter()))
             })
         
-        # Calculate client-wide metrics
-        all_leads = Lead.query.join(Campaign).filter(
-            Campaign.client_id == client_id,
-            Lead.created_at >= start_date
-        ).all()
-        
-        total_client_leads = len(all_leads)
-        total_client_connected = len([l for l in all_leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-        total_client_responded = len([l for l in all_leads if l.status in ['responded', 'completed']])
-        
-        client_connection_rate = (total_client_connected / total_client_leads * 100) if total_client_leads > 0 else 0
-        client_response_rate = (total_client_responded / total_client_leads * 100) if total_client_leads > 0 else 0
+        # Calculate client-wide metrics from the same counts
+        client_metrics = _lead_metrics(sum(status_counts.values(), Counter()))
         
         return jsonify({
             'client_id': client_id,
@@ -92,11 +98,11 @@ def client_comparative_analytics(client_id):
             'end_date': end_date.isoformat(),
             'client_summary': {
                 'total_campaigns': len(campaigns),
-                'total_leads': total_client_leads,
-                'total_connected': total_client_connected,
-                'total_responded': total_client_responded,
-                'overall_connection_rate': round(client_connection_rate, 2),
-                'overall_response_rate': round(client_response_rate, 2)
+                'total_leads': client_metrics['total_leads'],
+                'total_connected': client_metrics['connected_leads'],
+                'total_responded': client_metrics['responded_leads'],
+                'overall_connection_rate': client_metrics['connection_rate'],
+                'overall_response_rate': client_metrics['response_rate']
             },
             'campaign_analytics': campaign_analytics
         })
@@ -107,6 +113,7 @@ def client_comparative_analytics(client_id):
 
 
 @analytics_bp.route('/comparative/campaigns', methods=['GET'])
+@cache_response('analytics:comparative_campaigns', ttl=CACHE_CONFIG['analytics']['comparative'])
 def system_comparative_analytics():
     """Get comparative analytics across all campaigns in the system."""
     try:
@@ -118,67 +125,59 @@ def system_comparative_analytics():
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Get all campaigns
-        campaigns = Campaign.query.all()
-        
-        campaign_analytics = []
-        for campaign in campaigns:
-            # Get leads for this campaign
-            leads = Lead.query.filter(
-                Lead.campaign_id == campaign.id,
-                Lead.created_at >= start_date
-            ).all()
-            
-            # Calculate metrics
-            total_leads = len(leads)
-            connected_leads = len([l for l in leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-            responded_leads = len([l for l in leads if l.status in ['responded', 'completed']])
-            
-            # Calculate rates
-            connection_rate = (connected_leads / total_leads * 100) if total_leads > 0 else 0
-            response_rate = (responded_leads / total_leads * 100) if total_leads > 0 else 0
-            
-            campaign_analytics.append({
-                'campaign_id': campaign.id,
-                'campaign_name': campaign.name,
-                'client_id': campaign.client_id,
-                'campaign_status': campaign.status,
-                'metrics': {
-                    'total_leads': total_leads,
-                    'connected_leads': connected_leads,
-                    'responded_leads': responded_leads,
-                    'connection_rate': round(connection_rate, 2),
-                    'response_rate': round(response_rate, 2)
-                }
-            })
-        
-        # Sort by response rate (best performing first)
-        campaign_analytics.sort(key=lambda x: x['metrics']['response_rate'], reverse=True)
-        
-        # Limit results
-        campaign_analytics = campaign_analytics[:limit]
-        
-        # Calculate system-wide metrics
-        all_leads = Lead.query.filter(Lead.created_at >= start_date).all()
-        
-        total_system_leads = len(all_leads)
-        total_system_connected = len([l for l in all_leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-        total_system_responded = len([l for l in all_leads if l.status in ['responded', 'completed']])
-        
-        system_connection_rate = (total_system_connected / total_system_leads * 100) if total_system_leads > 0 else 0
-        system_response_rate = (total_system_responded / total_system_leads * 100) if total_system_leads > 0 else 0
+        # Aggregate each campaign's leads, then rank and limit in the database
+        campaign_totals = db.session.query(
+            Lead.campaign_id.label('campaign_id'),
+            *_lead_metric_columns()
+        ).filter(Lead.created_at >= start_date).group_by(Lead.campaign_id).subquery()
+        
+        total_leads = func.coalesce(campaign_totals.c.total_leads, 0)
+        connected_leads = func.coalesce(campaign_totals.c.connected_leads, 0)
+        responded_leads = func.coalesce(campaign_totals.c.responded_leads, 0)
+        response_rate = responded_leads * 100.0 / func.nullif(total_leads, 0)
+        
+        top_campaigns = db.session.query(
+            Campaign.id,
+            Campaign.name,
+            Campaign.client_id,
+            Campaign.status,
+            total_leads,
+            connected_leads,
+            responded_leads
+        ).outerjoin(
+            campaign_totals, campaign_totals.c.campaign_id == Campaign.id
+        ).order_by(
+            func.coalesce(response_rate, 0).desc(), Campaign.created_at, Campaign.id
+        ).limit(max(limit, 0)).all()
+        
+        campaign_analytics = [
+            {
+                'campaign_id': campaign_id,
+                'campaign_name': name,
+                'client_id': client_id,
+                'campaign_status': status,
+                'metrics': _lead_rates(total, connected, responded)
+            }
+            for campaign_id, name, client_id, status, total, connected, responded in top_campaigns
+        ]
+        
+        # Calculate system-wide metrics with a second aggregate over the same leads
+        system_metrics = _lead_rates(*db.session.query(*_lead_metric_columns()).filter(
+            Lead.created_at >= start_date
+        ).one())
+        total_campaigns = db.session.query(func.count(Campaign.id)).scalar()
         
         return jsonify({
             'days': days,
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
             'system_summary': {
-                'total_campaigns': len(campaigns),
-                'total_leads': total_system_leads,
-                'total_connected': total_system_connected,
-                'total_responded': total_system_responded,
-                'overall_connection_rate': round(system_connection_rate, 2),
-                'overall_response_rate': round(system_response_rate, 2)
+                'total_campaigns': total_campaigns,
+                'total_leads': system_metrics['total_leads'],
+                'total_connected': system_metrics['connected_leads'],
+                'total_responded': system_metrics['responded_leads'],
+                'overall_connection_rate': system_metrics['connection_rate'],
+                'overall_response_rate': system_metrics['response_rate']
             },
             'top_performing_campaigns': campaign_analytics
         })
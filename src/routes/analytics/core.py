@@ -7,16 +7,28 @@ This module contains the main analytics blueprint and core functionality:
 - Core analytics endpoints
 """
 
+import heapq
 import logging
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Any
 from flask import Blueprint, jsonify, request, current_app
-from sqlalchemy import func, and_, or_, desc, asc
+from sqlalchemy import func, and_, or_, desc, asc, select, cast, extract, Date, Integer
 from sqlalchemy.orm import joinedload
 
 from src.extensions import db
-from src.models import Campaign, Lead, Event, LinkedInAccount, Client
-from src.services.weekly_statistics import WeeklyStatisticsService
+from src.models import Lead, Event, LinkedInAccount, Client
+from src.models.lead import FIRST_LEVEL_SOURCE
+from src.utils.lead_statuses import (
+    INVITED_STATUSES,
+    CONNECTED_STATUSES,
+    MESSAGED_STATUSES,
+    RESPONDED_STATUSES,
+    count_statuses,
+)
+from src.config import STREAM_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -24,53 +36,132 @@ logger = logging.getLogger(__name__)
 from . import analytics_bp
 
 
+@lru_cache(maxsize=64)
+def _daterange_until(end_date: date, days: int):
+    """Build the tuple of N dates ending at end_date, oldest first."""
+    return tuple(end_date - timedelta(days=offset) for offset in range(days - 1, -1, -1))
+
+
 def _daterange(days: int):
-    """Generate a list of dates for the last N days."""
-    end_date = date.today()
-    start_date = end_date - timedelta(days=days-1)
+    """Get the dates for the last N days, oldest first.
     
-    current_date = start_date
-    while current_date <= end_date:
-        yield current_date
-        current_date += timedelta(days=1)
+    Windows up to a year are cached per calendar day, so the common ones
+    are built once a day; longer ones are built without caching.
+    """
+    if days > 366:
+        return _daterange_until.__wrapped__(date.today(), days)
+    return _daterange_until(date.today(), days)
 
 
-def _bucket_events_by_day(events):
-    """Group events by day for timeseries analysis."""
-    buckets = {}
-    for event in events:
-        day = event.timestamp.date()
-        if day not in buckets:
-            buckets[day] = []
-        buckets[day].append(event)
-    return buckets
+def _day_window(first_day: date, last_day: date):
+    """Get the [start, end) timestamps covering whole days first_day..last_day.
+    
+    Filtering with plain range bounds on the raw column keeps the
+    predicate index-friendly.
+    """
+    return (
+        datetime.combine(first_day, datetime.min.time()),
+        datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+    )
+
+
+def _day_windows(days):
+    """Get [start, end) timestamp ranges covering the given dates.
+    
+    Consecutive dates are merged into one range, so a set of days is
+    filtered with as few index range scans as possible.
+    """
+    windows = []
+    for day in sorted(days):
+        start, end = _day_window(day, day)
+        if windows and windows[-1][1] == start:
+            windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def _sql_date(column):
+    """Truncate a timestamp column to its calendar day in SQL.
+    
+    DATE() is understood by both PostgreSQL and SQLite; typing the result as
+    Date makes SQLite's string result come back as a date as well.
+    """
+    return func.date(column, type_=Date)
+
+
+def _campaign_lead_ids(campaign_id):
+    """Select the ids of a campaign's leads for use in an IN filter.
+    
+    Filtering events with Event.lead_id.in_() lets the planner run a
+    semi-join over the lead/event indexes instead of joining lead rows.
+    """
+    return select(Lead.id).where(Lead.campaign_id == campaign_id)
+
+
+def _first_level_lead_filter():
+    """SQL predicate for leads imported from the account's 1st-level connections."""
+    return Lead.meta_json['source'].as_string() == FIRST_LEVEL_SOURCE
+
+
+def _first_level_lead_ids(campaign_id):
+    """Select the ids of a campaign's 1st-level leads for use in an IN filter."""
+    return select(Lead.id).where(Lead.campaign_id == campaign_id, _first_level_lead_filter())
+
+
+def _lead_status_counts(campaign_id, recent_since):
+    """Count a campaign's leads per status, overall and for leads created since recent_since.
+
+    Both windows come from one grouped query that labels each lead as recent or not.
+    """
+    is_recent = (Lead.created_at >= recent_since).label('is_recent')
+    rows = db.session.query(Lead.status, is_recent, func.count(Lead.id)).filter(
+        Lead.campaign_id == campaign_id
+    ).group_by(Lead.status, is_recent).all()
+    
+    status_counts = Counter()
+    recent_status_counts = Counter()
+    for status, recent, count in rows:
+        status_counts[status] += count
+        if recent:
+            recent_status_counts[status] += count
+    
+    return dict(status_counts), dict(recent_status_counts)
+
+
+def _lead_metrics(status_counts):
+    """Calculate lead totals and connection/response rates from status counts."""
+    return _lead_rates(
+        sum(status_counts.values()),
+        count_statuses(status_counts, CONNECTED_STATUSES),
+        count_statuses(status_counts, RESPONDED_STATUSES)
+    )
 
 
-def _calculate_conversion_funnel(campaign_id, days=30):
-    """Calculate conversion funnel for a campaign."""
+def _lead_rates(total_leads, connected_leads, responded_leads):
+    """Calculate connection/response rates from lead counts."""
+    connection_rate = (connected_leads / total_leads * 100) if total_leads > 0 else 0
+    response_rate = (responded_leads / total_leads * 100) if total_leads > 0 else 0
+    
+    return {
+        'total_leads': total_leads,
+        'connected_leads': connected_leads,
+        'responded_leads': responded_leads,
+        'connection_rate': round(connection_rate, 2),
+        'response_rate': round(response_rate, 2)
+    }
+
+
+def _calculate_conversion_funnel(status_counts):
+    """Calculate conversion funnel from a campaign's lead status counts."""
     try:
-        # Get campaign
-        campaign = Campaign.query.get(campaign_id)
-        if not campaign:
-            return None
-        
-        # Calculate date range
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
-        # Get all leads for the campaign
-        leads = Lead.query.filter(
-            Lead.campaign_id == campaign_id,
-            Lead.created_at >= start_date
-        ).all()
-        
         # Calculate funnel stages
-        total_leads = len(leads)
-        invites_sent = len([l for l in leads if l.status in ['invite_sent', 'invited']])
-        connected = len([l for l in leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-        messaged = len([l for l in leads if l.status in ['messaged', 'responded', 'completed']])
-        responded = len([l for l in leads if l.status in ['responded', 'completed']])
-        completed = len([l for l in leads if l.status == 'completed'])
+        total_leads = sum(status_counts.values())
+        invites_sent = count_statuses(status_counts, INVITED_STATUSES)
+        connected = count_statuses(status_counts, CONNECTED_STATUSES)
+        messaged = count_statuses(status_counts, MESSAGED_STATUSES)
+        responded = count_statuses(status_counts, RESPONDED_STATUSES)
+        completed = status_counts.get('completed', 0)
         
         # Calculate conversion rates
         invite_rate = (invites_sent / total_leads * 100) if total_leads > 0 else 0
@@ -108,53 +199,85 @@ def _calculate_conversion_funnel(campaign_id, days=30):
         return None
 
 
-def _calculate_time_based_analytics(campaign_id, days=30):
+def _pair_response_times(campaign_events):
+    """Pair a campaign's sent messages with the lead's next reply.
+    
+    Returns the number of paired responses, their summed response time and
+    the number of sent messages.
+    """
+    # Stream the sent and received messages as plain rows to pair into
+    # response times, ordered per lead by the (lead_id, timestamp) index
+    # so each lead's replies arrive already sorted
+    events = db.session.query(
+        Event.lead_id,
+        (Event.event_type == 'message_received').label('is_reply'),
+        Event.timestamp
+    ).filter(
+        *campaign_events,
+        Event.event_type.in_(['message_sent', 'message_received'])
+    ).order_by(Event.lead_id, Event.timestamp).yield_per(STREAM_BATCH_SIZE)
+    
+    # Per-lead reply timestamps and the sent messages to pair against
+    # them; the reply test is evaluated by the database as a boolean
+    reply_times = {}
+    sent_messages = []
+    for event in events:
+        if event.is_reply:
+            reply_times.setdefault(event.lead_id, []).append(event.timestamp)
+        else:
+            sent_messages.append(event)
+    
+    # Calculate response times by pairing each sent message with the
+    # lead's first reply within 7 days, searched with bisect over the
+    # lead's sorted reply timestamps; only the running total and count
+    # are kept since the average is all that is reported
+    total_responses = 0
+    total_response_time = timedelta()
+    for event in sent_messages:
+        timestamps = reply_times.get(event.lead_id)
+        if not timestamps:
+            continue
+        
+        index = bisect_right(timestamps, event.timestamp)
+        if index < len(timestamps) and timestamps[index] <= event.timestamp + timedelta(days=7):
+            total_responses += 1
+            total_response_time += timestamps[index] - event.timestamp
+    
+    return total_responses, total_response_time, len(sent_messages)
+
+
+def _calculate_time_based_analytics(campaign_id, days=30, now=None):
     """Calculate time-based analytics for a campaign."""
     try:
-        # Get campaign
-        campaign = Campaign.query.get(campaign_id)
-        if not campaign:
-            return None
-        
         # Calculate date range
-        end_date = datetime.utcnow()
+        end_date = now or datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Get events for the campaign
-        events = Event.query.join(Lead).filter(
-            Lead.campaign_id == campaign_id,
+        campaign_events = (
+            Event.lead_id.in_(_campaign_lead_ids(campaign_id)),
             Event.timestamp >= start_date
-        ).all()
+        )
         
-        # Analyze hourly patterns
-        hourly_replies = {}
-        for event in events:
-            if event.event_type == 'message_received':
-                hour = event.timestamp.hour
-                if hour not in hourly_replies:
-                    hourly_replies[hour] = 0
-                hourly_replies[hour] += 1
+        # Count replies per hour of day in SQL
+        reply_hour = cast(extract('hour', Event.timestamp), Integer).label('hour')
+        hourly_replies = dict(
+            db.session.query(reply_hour, func.count(Event.id)).filter(
+                *campaign_events,
+                Event.event_type == 'message_received'
+            ).group_by(reply_hour).all()
+        )
         
         # Find optimal sending times
-        optimal_hours = sorted(hourly_replies.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        # Calculate response times
-        response_times = []
-        for event in events:
-            if event.event_type == 'message_sent':
-                # Find next reply within 7 days
-                next_reply = Event.query.join(Lead).filter(
-                    Lead.campaign_id == campaign_id,
-                    Event.event_type == 'message_received',
-                    Event.timestamp > event.timestamp,
-                    Event.timestamp <= event.timestamp + timedelta(days=7)
-                ).first()
-                
-                if next_reply:
-                    response_time = (next_reply.timestamp - event.timestamp).total_seconds() / 3600  # hours
-                    response_times.append(response_time)
-        
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        optimal_hours = heapq.nlargest(3, hourly_replies.items(), key=lambda x: x[1])
+        
+        # Without replies in the window there is nothing to pair, so idle
+        # campaigns skip the message fetch entirely
+        if hourly_replies:
+            total_responses, total_response_time, sent_count = _pair_response_times(campaign_events)
+        else:
+            total_responses, total_response_time, sent_count = 0, timedelta(), 0
+        
+        avg_response_time = total_response_time.total_seconds() / 3600 / total_responses if total_responses else 0  # hours
         
         return {
             'hourly_analysis': {
@@ -163,8 +286,8 @@ def _calculate_time_based_analytics(campaign_id, days=30):
             },
             'response_analysis': {
                 'average_response_time_hours': round(avg_response_time, 2),
-                'total_responses': len(response_times),
-                'response_rate': round((len(response_times) / len([e for e in events if e.event_type == 'message_sent']) * 100) if events else 0, 2)
+                'total_responses': total_responses,
+                'response_rate': round((total_responses / sent_count * 100) if sent_count else 0, 2)
             }
         }
         
@@ -173,24 +296,17 @@ def _calculate_time_based_analytics(campaign_id, days=30):
         return None
 
 
-def _calculate_predictive_analytics(campaign_id):
-    """Calculate predictive analytics for a campaign."""
+def _calculate_predictive_analytics(campaign, status_counts, now=None):
+    """Calculate predictive analytics from a campaign's lead status counts."""
     try:
-        # Get campaign
-        campaign = Campaign.query.get(campaign_id)
-        if not campaign:
-            return None
-        
-        # Get campaign data
-        leads = Lead.query.filter_by(campaign_id=campaign_id).all()
-        total_leads = len(leads)
+        total_leads = sum(status_counts.values())
         
         if total_leads == 0:
             return None
         
         # Calculate current performance
-        connected_leads = len([l for l in leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-        responded_leads = len([l for l in leads if l.status in ['responded', 'completed']])
+        connected_leads = count_statuses(status_counts, CONNECTED_STATUSES)
+        responded_leads = count_statuses(status_counts, RESPONDED_STATUSES)
         
         # Calculate rates
         connection_rate = connected_leads / total_leads
@@ -202,7 +318,7 @@ def _calculate_predictive_analytics(campaign_id):
         # Calculate campaign completion estimate
         if campaign.status == 'active':
             # Estimate based on current pace
-            days_active = (datetime.utcnow() - campaign.created_at).days
+            days_active = ((now or datetime.utcnow()) - campaign.created_at).days
             if days_active > 0:
                 leads_per_day = total_leads / days_active
                 estimated_days_to_completion = max(0, (estimated_completions - responded_leads) / leads_per_day)
@@ -10,15 +10,53 @@ This module contains functionality for:
 import logging
 import csv
 import io
+import zlib
+from collections import defaultdict
+from itertools import islice
 from datetime import datetime, timedelta
 from typing import Dict, Any
-from flask import jsonify, request, send_file, current_app
+from flask import jsonify, request, current_app, stream_with_context
+from sqlalchemy import func, cast, case, Text
 
 from src.extensions import db
 from src.models import Campaign, Lead, Event
+from src.utils.lead_statuses import (
+    INVITED_STATUSES,
+    CONNECTED_STATUSES,
+    MESSAGED_STATUSES,
+    RESPONDED_STATUSES,
+)
+from src.config import STREAM_BATCH_SIZE
+from .core import _sql_date, _campaign_lead_ids
 
 logger = logging.getLogger(__name__)
 
+# Characters of CSV text buffered before a chunk is sent to the client
+CSV_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Rows passed to csv.writer.writerows at a time
+CSV_WRITE_BATCH_SIZE = 500
+
+# gzip level for CSV downloads; level 1 already compresses CSV text well
+CSV_GZIP_LEVEL = 1
+
+# Leads export timestamp columns, taken from the latest event of each type
+LEAD_TIMESTAMP_EVENTS = {
+    'connection_accepted': 'connected_at',
+    'message_sent': 'last_message_sent_at',
+    'connection_request_sent': 'invite_sent_at',
+    'invite_sent': 'invite_sent_at',
+}
+
+# Analytics export columns and the lead statuses each one counts
+EXPORT_COLUMN_STATUSES = (
+    ('invites_sent', INVITED_STATUSES),
+    ('connections_made', CONNECTED_STATUSES),
+    ('messages_sent', MESSAGED_STATUSES),
+    ('responses_received', RESPONDED_STATUSES),
+    ('completions', frozenset({'completed'})),
+)
+
 # Import the blueprint from the package
 from . import analytics_bp
 
@@ -38,22 +76,27 @@ def export_campaign_csv(campaign_id):
         
         # Generate CSV based on data type
         if data_type == 'leads':
-            csv_data = _export_leads_csv(campaign)
+            header, rows = _export_leads_csv(campaign)
         elif data_type == 'events':
-            csv_data = _export_events_csv(campaign, days)
+            header, rows = _export_events_csv(campaign, days)
         elif data_type == 'analytics':
-            csv_data = _export_analytics_csv(campaign, days)
+            header, rows = _export_analytics_csv(campaign, days)
         else:
             return jsonify({'error': 'Invalid data type. Use: leads, events, or analytics'}), 400
         
-        # Create file response
+        # Stream the file response as the rows are read
         filename = f"campaign_{campaign_id}_{data_type}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
         
-        return send_file(
-            io.BytesIO(csv_data.encode('utf-8')),
+        chunks = _stream_csv(header, rows)
+        headers = {'Content-Disposition': f'attachment; filename={filename}', 'Vary': 'Accept-Encoding'}
+        if request.accept_encodings['gzip']:
+            chunks = _gzip_chunks(chunks)
+            headers['Content-Encoding'] = 'gzip'
+        
+        return current_app.response_class(
+            stream_with_context(chunks),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+            headers=headers
         )
         
     except Exception as e:
@@ -61,18 +104,71 @@ def export_campaign_csv(campaign_id):
         return jsonify({'error': str(e)}), 500
 
 
-def _export_leads_csv(campaign):
-    """Export leads data to CSV."""
+def _stream_csv(header, rows):
+    """Write CSV rows through a small buffer, yielding the text in chunks."""
     try:
-        # Get all leads for the campaign
-        leads = Lead.query.filter_by(campaign_id=campaign.id).all()
-        
-        # Create CSV output
         output = io.StringIO()
         writer = csv.writer(output)
+        writer.writerow(header)
+        
+        # Hand rows to the C writer in batches rather than one call per row
+        rows = iter(rows)
+        while batch := list(islice(rows, CSV_WRITE_BATCH_SIZE)):
+            writer.writerows(batch)
+            if output.tell() >= CSV_STREAM_CHUNK_SIZE:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        
+        yield output.getvalue()
+        
+    except Exception as e:
+        logger.error(f"Error streaming CSV export: {str(e)}")
+        raise
+
+
+def _gzip_chunks(chunks):
+    """Compress streamed CSV text chunks into a single gzip stream."""
+    compressor = zlib.compressobj(CSV_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _export_leads_csv(campaign):
+    """Export leads data as a CSV header and lazily streamed rows."""
+    try:
+        # Stream the campaign's leads as plain rows of the exported columns,
+        # with empty strings for missing names coalesced in SQL
+        leads = db.session.query(
+            Lead.id,
+            func.coalesce(Lead.first_name, '').label('first_name'),
+            func.coalesce(Lead.last_name, '').label('last_name'),
+            func.coalesce(Lead.company_name, '').label('company_name'),
+            Lead.public_identifier,
+            Lead.status,
+            Lead.current_step,
+            Lead.created_at
+        ).filter(Lead.campaign_id == campaign.id).yield_per(STREAM_BATCH_SIZE)
+        
+        # Get each lead's latest connection, message and invite timestamps
+        # from the event log in one grouped query rather than per lead
+        lead_timestamps = defaultdict(dict)
+        for lead_id, event_type, timestamp in db.session.query(
+            Event.lead_id,
+            Event.event_type,
+            func.max(Event.timestamp)
+        ).filter(
+            Event.lead_id.in_(_campaign_lead_ids(campaign.id)),
+            Event.event_type.in_(list(LEAD_TIMESTAMP_EVENTS))
+        ).group_by(Event.lead_id, Event.event_type).all():
+            column = LEAD_TIMESTAMP_EVENTS[event_type]
+            previous = lead_timestamps[lead_id].get(column)
+            lead_timestamps[lead_id][column] = max(previous, timestamp) if previous else timestamp
         
-        # Write header
-        writer.writerow([
+        header = [
             'Lead ID',
             'First Name',
             'Last Name',
@@ -85,69 +181,78 @@ def _export_leads_csv(campaign):
             'Connected At',
             'Last Message Sent At',
             'Invite Sent At'
-        ])
-        
-        # Write data
-        for lead in leads:
-            writer.writerow([
-                lead.id,
-                lead.first_name or '',
-                lead.last_name or '',
-                lead.company_name or '',
-                lead.public_identifier or '',
-                lead.status or '',
-                getattr(lead, 'connection_type', '') or '',
-                lead.current_step or 0,
-                lead.created_at.isoformat() if lead.created_at else '',
-                lead.connected_at.isoformat() if lead.connected_at else '',
-                lead.last_message_sent_at.isoformat() if lead.last_message_sent_at else '',
-                lead.invite_sent_at.isoformat() if lead.invite_sent_at else ''
-            ])
-        
-        return output.getvalue()
+        ]
+        
+        rows = (
+            _lead_csv_row(lead, lead_timestamps.get(lead.id, {}))
+            for lead in leads
+        )
+        
+        return header, rows
         
     except Exception as e:
         logger.error(f"Error exporting leads CSV: {str(e)}")
         raise
 
 
+def _lead_csv_row(lead, timestamps):
+    """Build a leads export row from a lead row and its event timestamps."""
+    return [
+        lead.id,
+        lead.first_name,
+        lead.last_name,
+        lead.company_name,
+        lead.public_identifier,
+        lead.status,
+        '',  # Connection type is not tracked on leads
+        lead.current_step,
+        lead.created_at.isoformat(),
+        timestamps['connected_at'].isoformat() if 'connected_at' in timestamps else '',
+        timestamps['last_message_sent_at'].isoformat() if 'last_message_sent_at' in timestamps else '',
+        timestamps['invite_sent_at'].isoformat() if 'invite_sent_at' in timestamps else ''
+    ]
+
+
 def _export_events_csv(campaign, days=30):
-    """Export events data to CSV."""
+    """Export events data as a CSV header and lazily streamed rows."""
     try:
         # Calculate date range
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Get events for the campaign
-        events = Event.query.join(Lead).filter(
+        # Stream the campaign's events as plain rows, taking meta_json as the
+        # JSON text the database stores rather than decoding it per row
+        events = db.session.query(
+            Event.id,
+            Event.lead_id,
+            Event.event_type,
+            Event.timestamp,
+            func.coalesce(func.nullif(cast(Event.meta_json, Text), 'null'), '').label('meta_json')
+        ).join(Lead).filter(
             Lead.campaign_id == campaign.id,
             Event.timestamp >= start_date
-        ).order_by(Event.timestamp.desc()).all()
+        ).order_by(Event.timestamp.desc()).yield_per(STREAM_BATCH_SIZE)
         
-        # Create CSV output
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
+        header = [
             'Event ID',
             'Lead ID',
             'Event Type',
             'Timestamp',
             'Meta JSON'
-        ])
+        ]
         
-        # Write data
-        for event in events:
-            writer.writerow([
+        rows = (
+            [
                 event.id,
                 event.lead_id,
                 event.event_type,
                 event.timestamp.isoformat(),
-                str(event.meta_json) if event.meta_json else ''
-            ])
+                event.meta_json
+            ]
+            for event in events
+        )
         
-        return output.getvalue()
+        return header, rows
         
     except Exception as e:
         logger.error(f"Error exporting events CSV: {str(e)}")
@@ -155,24 +260,28 @@ def _export_events_csv(campaign, days=30):
 
 
 def _export_analytics_csv(campaign, days=30):
-    """Export analytics data to CSV."""
+    """Export analytics data as a CSV header and rows."""
     try:
         # Calculate date range
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Get leads for the campaign
-        leads = Lead.query.filter(
+        # Count the campaign's new leads per creation day, and how many of
+        # them reached each funnel column, in SQL
+        created_day = _sql_date(Lead.created_at).label('day')
+        daily_counts = db.session.query(
+            created_day,
+            func.count(Lead.id),
+            *(
+                func.sum(case((Lead.status.in_(statuses), 1), else_=0)).label(column)
+                for column, statuses in EXPORT_COLUMN_STATUSES
+            )
+        ).filter(
             Lead.campaign_id == campaign.id,
             Lead.created_at >= start_date
-        ).all()
-        
-        # Create CSV output
-        output = io.StringIO()
-        writer = csv.writer(output)
+        ).group_by(created_day).order_by(created_day)
         
-        # Write header
-        writer.writerow([
+        header = [
             'Date',
             'New Leads',
             'Invites Sent',
@@ -180,50 +289,11 @@ def _export_analytics_csv(campaign, days=30):
             'Messages Sent',
             'Responses Received',
             'Completions'
-        ])
-        
-        # Group leads by date
-        leads_by_date = {}
-        for lead in leads:
-            date_key = lead.created_at.date()
-            if date_key not in leads_by_date:
-                leads_by_date[date_key] = {
-                    'new_leads': 0,
-                    'invites_sent': 0,
-                    'connections_made': 0,
-                    'messages_sent': 0,
-                    'responses_received': 0,
-                    'completions': 0
-                }
-            
-            leads_by_date[date_key]['new_leads'] += 1
-            
-            # Count status changes
-            if lead.status in ['invite_sent', 'invited']:
-                leads_by_date[date_key]['invites_sent'] += 1
-            if lead.status in ['connected', 'messaged', 'responded', 'completed']:
-                leads_by_date[date_key]['connections_made'] += 1
-            if lead.status in ['messaged', 'responded', 'completed']:
-                leads_by_date[date_key]['messages_sent'] += 1
-            if lead.status in ['responded', 'completed']:
-                leads_by_date[date_key]['responses_received'] += 1
-            if lead.status == 'completed':
-                leads_by_date[date_key]['completions'] += 1
-        
-        # Write data
-        for date_key in sorted(leads_by_date.keys()):
-            data = leads_by_date[date_key]
-            writer.writerow([
-                date_key.isoformat(),
-                data['new_leads'],
-                data['invites_sent'],
-                data['connections_made'],
-                data['messages_sent'],
-                data['responses_received'],
-                data['completions']
-            ])
-        
-        return output.getvalue()
+        ]
+        
+        rows = ([day.isoformat(), *counts] for day, *counts in daily_counts)
+        
+        return header, rows
         
     except Exception as e:
         logger.error(f"Error exporting analytics CSV: {str(e)}")
@@ -9,12 +9,13 @@ This module contains functionality for:
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any
-from flask import jsonify, request, current_app
-from sqlalchemy import func, and_, or_, desc, asc
+from flask import jsonify, request
+from sqlalchemy import func, desc
+from sqlalchemy.orm import raiseload
 
 from src.extensions import db
-from src.models import Campaign, Lead, Event, Client
+from src.models import Campaign, Lead, Event
+from src.services.caching import cache_response, CACHE_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,7 @@ from . import analytics_bp
 
 
 @analytics_bp.route('/real-time/activity', methods=['GET'])
+@cache_response('analytics:real_time', ttl=CACHE_CONFIG['analytics']['real_time'])
 def real_time_activity():
     """Get real-time activity across all campaigns (last 24 hours)."""
     try:
@@ -34,8 +36,8 @@ def real_time_activity():
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
         
-        # Get recent events
-        recent_events = Event.query.filter(
+        # Get recent events (serialized from their own columns only)
+        recent_events = Event.query.options(raiseload('*')).filter(
             Event.timestamp >= start_time
         ).order_by(desc(Event.timestamp)).limit(limit).all()
         
@@ -47,26 +49,47 @@ def real_time_activity():
             Event.timestamp >= start_time
         ).group_by(Event.event_type).all()
         
-        # Get recent leads
-        recent_leads = Lead.query.filter(
+        # Get recent leads (only the columns reported below)
+        recent_leads = db.session.query(
+            Lead.id,
+            Lead.first_name,
+            Lead.last_name,
+            Lead.company_name,
+            Lead.status,
+            Lead.created_at,
+            Lead.campaign_id
+        ).filter(
             Lead.created_at >= start_time
         ).order_by(desc(Lead.created_at)).limit(20).all()
         
-        # Get active campaigns
-        active_campaigns = Campaign.query.filter_by(status='active').all()
+        # Get active campaigns without loading their sequence definitions
+        active_campaigns = db.session.query(
+            Campaign.id,
+            Campaign.name,
+            Campaign.client_id,
+            Campaign.status
+        ).filter(Campaign.status == 'active').all()
         
         # Calculate activity metrics
         total_events = sum(count for _, count in event_counts)
         total_new_leads = len(recent_leads)
         total_active_campaigns = len(active_campaigns)
         
-        # Get events by campaign
-        events_by_campaign = db.session.query(
-            Campaign.name.label('campaign_name'),
+        # Get events by campaign: rank campaign ids on the event/lead join first,
+        # then look up names for the top ten only
+        campaign_event_counts = db.session.query(
+            Lead.campaign_id.label('campaign_id'),
             func.count(Event.id).label('event_count')
-        ).select_from(Campaign).join(Lead, Campaign.id == Lead.campaign_id).join(Event, Lead.id == Event.lead_id).filter(
+        ).join(Lead, Lead.id == Event.lead_id).filter(
             Event.timestamp >= start_time
-        ).group_by(Campaign.name).order_by(desc(func.count(Event.id))).limit(10).all()
+        ).group_by(Lead.campaign_id).order_by(desc('event_count')).limit(10).subquery()
+        
+        events_by_campaign = db.session.query(
+            Campaign.name.label('campaign_name'),
+            campaign_event_counts.c.event_count
+        ).join(
+            campaign_event_counts, Campaign.id == campaign_event_counts.c.campaign_id
+        ).order_by(desc(campaign_event_counts.c.event_count)).all()
         
         return jsonify({
             'time_range': {
@@ -9,16 +9,28 @@ This module contains functionality for:
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from flask import jsonify, request, current_app
 
 from src.extensions import db
 from src.models import Campaign, Lead, Event, Client
-from src.services.weekly_statistics import WeeklyStatisticsService
+from src.services.weekly_statistics import get_weekly_statistics_service, WEEKLY_REPORT_WORKERS
+from src.services.caching import cache_response, CACHE_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Fixed weekly report settings, built once at import
+WEEKLY_STATS_DEFAULT_SETTINGS = {
+    'send_day': 'monday',  # Default to Monday
+    'send_time': '09:00',  # Default to 9 AM
+    'timezone': 'UTC',
+    'email_template': 'default',
+    'include_charts': True,
+    'include_comparisons': True
+}
+
 # Import the blueprint from the package
 from . import analytics_bp
 
@@ -30,43 +42,48 @@ def generate_weekly_statistics():
         data = request.get_json() or {}
         force_regenerate = data.get('force_regenerate', False)
         
-        # Initialize weekly statistics service
-        weekly_stats_service = WeeklyStatisticsService()
+        # Get the shared weekly statistics service
+        weekly_stats_service = get_weekly_statistics_service()
         
         # Get all clients
-        clients = Client.query.all()
+        clients = db.session.query(Client.id, Client.name).all()
         
-        results = []
-        for client in clients:
-            try:
-                # Generate statistics for this client (last 7 days)
-                end_date = datetime.utcnow()
-                start_date = end_date - timedelta(days=7)
-                stats = weekly_stats_service.generate_client_statistics(client.id, start_date, end_date)
-                
-                if stats:
-                    results.append({
-                        'client_id': client.id,
-                        'client_name': client.name,
-                        'status': 'success',
-                        'statistics': stats
-                    })
-                else:
-                    results.append({
+        # Statistics cover the same 7-day window for every client
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=7)
+        app = current_app._get_current_object()
+        
+        def generate_for_client(client):
+            # Each worker gets its own app context and therefore its own session
+            with app.app_context():
+                try:
+                    stats = weekly_stats_service.generate_client_statistics(client.id, start_date, end_date)
+                    
+                    if stats:
+                        return {
+                            'client_id': client.id,
+                            'client_name': client.name,
+                            'status': 'success',
+                            'statistics': stats
+                        }
+                    return {
                         'client_id': client.id,
                         'client_name': client.name,
                         'status': 'no_data',
                         'message': 'No data available for this client'
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Error generating statistics for client {client.id}: {str(e)}")
-                results.append({
-                    'client_id': client.id,
-                    'client_name': client.name,
-                    'status': 'error',
-                    'error': str(e)
-                })
+                    }
+                        
+                except Exception as e:
+                    logger.error(f"Error generating statistics for client {client.id}: {str(e)}")
+                    return {
+                        'client_id': client.id,
+                        'client_name': client.name,
+                        'status': 'error',
+                        'error': str(e)
+                    }
+        
+        with ThreadPoolExecutor(max_workers=WEEKLY_REPORT_WORKERS) as pool:
+            results = list(pool.map(generate_for_client, clients))
         
         return jsonify({
             'message': 'Weekly statistics generation completed',
@@ -86,8 +103,8 @@ def send_all_weekly_reports():
         data = request.get_json() or {}
         force_send = data.get('force_send', False)
         
-        # Initialize weekly statistics service
-        weekly_stats_service = WeeklyStatisticsService()
+        # Get the shared weekly statistics service
+        weekly_stats_service = get_weekly_statistics_service()
         
         # Send all weekly reports
         result = weekly_stats_service.send_all_weekly_reports()
@@ -103,6 +120,7 @@ def send_all_weekly_reports():
 
 
 @analytics_bp.route('/weekly-stats/preview/<client_id>', methods=['GET'])
+@cache_response('analytics:weekly_stats', ttl=CACHE_CONFIG['analytics']['weekly_stats'], key_args=['client_id'])
 def preview_weekly_statistics(client_id):
     """Preview weekly statistics for a specific client."""
     try:
@@ -111,8 +129,8 @@ def preview_weekly_statistics(client_id):
         if not client:
             return jsonify({'error': 'Client not found'}), 404
         
-        # Initialize weekly statistics service
-        weekly_stats_service = WeeklyStatisticsService()
+        # Get the shared weekly statistics service
+        weekly_stats_service = get_weekly_statistics_service()
         
         # Generate statistics for preview (last 7 days)
         end_date = datetime.utcnow()
@@ -142,15 +160,10 @@ def preview_weekly_statistics(client_id):
 def get_weekly_stats_settings():
     """Get weekly statistics settings."""
     try:
-        # Get settings from environment
+        # Only the enabled flag comes from the app config
         settings = {
             'enabled': current_app.config.get('WEEKLY_STATS_ENABLED', True),
-            'send_day': 'monday',  # Default to Monday
-            'send_time': '09:00',  # Default to 9 AM
-            'timezone': 'UTC',
-            'email_template': 'default',
-            'include_charts': True,
-            'include_comparisons': True
+            **WEEKLY_STATS_DEFAULT_SETTINGS
         }
         
         return jsonify(settings)
@@ -176,8 +189,8 @@ def test_weekly_statistics():
         if not client:
             return jsonify({'error': 'Client not found'}), 404
         
-        # Initialize weekly statistics service
-        weekly_stats_service = WeeklyStatisticsService()
+        # Get the shared weekly statistics service
+        weekly_stats_service = get_weekly_statistics_service()
         
         # Generate statistics (last 7 days)
         end_date = datetime.utcnow()
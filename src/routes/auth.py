@@ -1,9 +1,45 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from datetime import timedelta
+import hmac
+import threading
+import time
 
 auth_bp = Blueprint('auth', __name__)
 
+# Expected API key, encoded once for constant-time comparison
+API_KEY_BYTES = b'linkedin-automation-api-key'
+
+# Login tokens are valid for 24 hours; a cached token is reissued until it
+# has less than an hour left
+LOGIN_TOKEN_LIFETIME = timedelta(hours=24)
+LOGIN_TOKEN_MIN_REMAINING_SECONDS = 3600
+
+_login_token_lock = threading.Lock()
+_login_token = None  # (signing key, token, expires at epoch seconds)
+
+
+def _get_login_token():
+    """Return a login token and its remaining lifetime, signing a new one only when needed."""
+    global _login_token
+    signing_key = current_app.config.get('JWT_SECRET_KEY')
+    
+    with _login_token_lock:
+        now = time.time()
+        if (
+            _login_token is None
+            or _login_token[0] != signing_key
+            or _login_token[2] - now <= LOGIN_TOKEN_MIN_REMAINING_SECONDS
+        ):
+            token = create_access_token(
+                identity='api-user',
+                expires_delta=LOGIN_TOKEN_LIFETIME
+            )
+            _login_token = (signing_key, token, now + LOGIN_TOKEN_LIFETIME.total_seconds())
+        
+        _, token, expires_at = _login_token
+        return token, int(expires_at - now)
+
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -19,17 +55,14 @@ def login():
         api_key = data['api_key']
         
         # Simple validation - in production, use proper API key management
-        if api_key == 'linkedin-automation-api-key':
-            # Create JWT token with 24 hour expiration
-            access_token = create_access_token(
-                identity='api-user',
-                expires_delta=timedelta(hours=24)
-            )
+        if isinstance(api_key, str) and hmac.compare_digest(api_key.encode(), API_KEY_BYTES):
+            # Reuse the current 24 hour JWT token while it is still fresh
+            access_token, expires_in = _get_login_token()
             
             return jsonify({
                 'access_token': access_token,
                 'token_type': 'Bearer',
-                'expires_in': 86400  # 24 hours in seconds
+                'expires_in': expires_in
             }), 200
         else:
             return jsonify({'error': 'Invalid API key'}), 401
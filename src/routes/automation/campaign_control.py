@@ -203,15 +203,14 @@ def get_campaign_status(campaign_id):
         if not campaign:
             return jsonify({'error': 'Campaign not found'}), 404
         
-        # Get lead statistics
-        leads = Lead.query.filter_by(campaign_id=campaign_id).all()
-        total_leads = len(leads)
-        
-        # Calculate status breakdown
-        status_counts = {}
-        for lead in leads:
-            status = lead.status
-            status_counts[status] = status_counts.get(status, 0) + 1
+        # Get lead statistics (one row per status instead of every lead)
+        status_counts = dict(
+            db.session.query(Lead.status, func.count(Lead.id))
+            .filter(Lead.campaign_id == campaign_id)
+            .group_by(Lead.status)
+            .all()
+        )
+        total_leads = sum(status_counts.values())
         
         # Get recent events
         recent_events = Event.query.join(Lead).filter(
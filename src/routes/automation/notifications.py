@@ -13,7 +13,7 @@ from typing import Dict, Any
 from flask import jsonify, request, current_app
 
 from src.services.notifications import NotificationService
-from src.services.weekly_statistics import WeeklyStatisticsService
+from src.services.weekly_statistics import get_weekly_statistics_service
 
 logger = logging.getLogger(__name__)
 
@@ -117,8 +117,8 @@ def test_weekly_stats_simple():
         if not client_id:
             return jsonify({'error': 'client_id is required'}), 400
         
-        # Initialize weekly statistics service
-        weekly_stats_service = WeeklyStatisticsService()
+        # Get the shared weekly statistics service
+        weekly_stats_service = get_weekly_statistics_service()
         
         # Generate statistics (last 7 days)
         end_date = datetime.utcnow()
@@ -7,6 +7,9 @@ Testing and debugging endpoints.
 """
 
 from flask import request, jsonify
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload
+from src.extensions import db
 from src.routes.automation import automation_bp
 from src.models.lead import Lead
 from src.models.campaign import Campaign
@@ -115,7 +118,8 @@ def test_ready_check():
         if not lead_id:
             return jsonify({'error': 'lead_id is required'}), 400
         
-        lead = Lead.query.get(lead_id)
+        # Load the campaign with the lead so the ready check finds it in the session
+        lead = Lead.query.options(joinedload(Lead.campaign)).get(lead_id)
         if not lead:
             return jsonify({'error': 'Lead not found'}), 404
         
@@ -146,18 +150,16 @@ def test_reset_leads():
         if not campaign_id:
             return jsonify({'error': 'campaign_id is required'}), 400
         
-        # Get leads for this campaign
-        leads = Lead.query.filter_by(campaign_id=campaign_id).all()
-        
-        reset_count = 0
-        for lead in leads:
-            if lead.status in ['error', 'completed']:
-                reset_count += 1
-                # In simulation, we just count what would be reset
+        # Count the campaign's leads and those that would be reset in one query
+        # In simulation, we just count what would be reset
+        total_leads, reset_count = db.session.query(
+            func.count(Lead.id),
+            func.coalesce(func.sum(case((Lead.status.in_(['error', 'completed']), 1), else_=0)), 0)
+        ).filter(Lead.campaign_id == campaign_id).one()
         
         return jsonify({
             'campaign_id': campaign_id,
-            'total_leads': len(leads),
+            'total_leads': total_leads,
             'would_reset': reset_count,
             'note': 'This was a simulation - no leads were actually reset'
         })
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models import db, Campaign, Client
+from src.models import db, Campaign, Client, CampaignDailyStat
 from sqlalchemy.exc import IntegrityError
 from src.utils.error_handling import (
     handle_validation_error,
@@ -153,6 +153,9 @@ def delete_campaign(campaign_id):
         if not campaign:
             return handle_not_found_error("Campaign", campaign_id)
         
+        # Rollup rows are not part of the ORM cascade, and SQLite does not
+        # enforce ON DELETE CASCADE, so remove them explicitly
+        CampaignDailyStat.query.filter_by(campaign_id=campaign_id).delete(synchronize_session=False)
         db.session.delete(campaign)
         db.session.commit()
         
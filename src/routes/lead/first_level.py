@@ -11,6 +11,7 @@ from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 from sqlalchemy.exc import IntegrityError
 from src.models import db, Lead, Campaign, LinkedInAccount, Event
+from src.models.lead import FIRST_LEVEL_SOURCE
 from src.services.unipile_client import UnipileClient, UnipileAPIError
 from src.routes.lead import lead_bp
 from datetime import datetime
@@ -86,7 +87,8 @@ def import_first_level_connections(campaign_id):
                     last_name=connection.get('last_name'),
                     company_name=company_name,
                     public_identifier=public_identifier,
-                    status='connected'  # Already connected
+                    status='connected',  # Already connected
+                    meta_json={'source': FIRST_LEVEL_SOURCE}
                 )
                 
                 db.session.add(lead)
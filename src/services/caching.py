@@ -15,7 +15,7 @@ from typing import Any, Optional, Dict, List, Union
 from datetime import datetime, timedelta
 from functools import wraps
 import redis
-from flask import request, jsonify, current_app
+from flask import request, current_app
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +84,28 @@ class CacheService:
             logger.error(f"Error setting cache key {key}: {str(e)}")
             return False
     
+    def get_raw(self, key: str) -> Optional[str]:
+        """Get a cached value as its stored JSON text, without decoding it."""
+        if not self.redis_client:
+            return None
+        
+        try:
+            return self.redis_client.get(key)
+        except Exception as e:
+            logger.error(f"Error getting cache key {key}: {str(e)}")
+            return None
+    
+    def set_raw(self, key: str, value: str, ttl: int = 300) -> bool:
+        """Set an already serialized JSON value in cache with TTL."""
+        if not self.redis_client:
+            return False
+        
+        try:
+            return self.redis_client.setex(key, ttl, value)
+        except Exception as e:
+            logger.error(f"Error setting cache key {key}: {str(e)}")
+            return False
+    
     def delete(self, key: str) -> bool:
         """Delete a value from cache."""
         if not self.redis_client:
@@ -184,21 +206,20 @@ def cache_response(prefix: str, ttl: int = 300, key_args: List[str] = None):
                 # Use all arguments
                 cache_key = cache._generate_cache_key(prefix, *args, **kwargs)
             
-            # Try to get from cache
-            cached_response = cache.get(cache_key)
+            # Try to get from cache; the stored JSON text is returned as-is
+            cached_response = cache.get_raw(cache_key)
             if cached_response:
                 logger.info(f"Cache hit for key: {cache_key}")
-                return jsonify(cached_response)
+                return current_app.response_class(cached_response, mimetype='application/json')
             
             # Execute function and cache result
             logger.info(f"Cache miss for key: {cache_key}")
             response = func(*args, **kwargs)
             
-            # Cache successful responses only
-            if hasattr(response, 'status_code') and response.status_code == 200:
+            # Cache successful JSON responses only
+            if hasattr(response, 'status_code') and response.status_code == 200 and response.is_json:
                 try:
-                    response_data = response.get_json()
-                    cache.set(cache_key, response_data, ttl)
+                    cache.set_raw(cache_key, response.get_data(as_text=True), ttl)
                 except Exception as e:
                     logger.error(f"Error caching response: {str(e)}")
             
@@ -255,8 +276,9 @@ CACHE_CONFIG = {
         'detail': 300,  # 5 minutes
     },
     'analytics': {
-        'campaign': 900,  # 15 minutes
-        'comparative': 1800,  # 30 minutes
-        'real_time': 60,  # 1 minute
+        'campaign': 60,  # 1 minute (dashboards poll these)
+        'comparative': 60,  # 1 minute
+        'real_time': 30,  # 30 seconds
+        'weekly_stats': 3600,  # 1 hour
     }
 }
@@ -21,6 +21,7 @@ from src.extensions import db
 from src.models import Lead, LinkedInAccount, Campaign, Event
 from src.services.sequence_engine import SequenceEngine
 from src.models.rate_usage import RateUsage
+from src.models.campaign_daily_stat import ROLLUP_REBUILD_DAYS
 from src.services.unipile_client import UnipileClient
 
 # Import methods from separate modules
@@ -46,7 +47,8 @@ from .connection_checker import (
 from .nightly_jobs import (
     _maybe_run_nightly_backfills,
     _run_conversation_id_backfill,
-    _run_rate_usage_backfill
+    _run_rate_usage_backfill,
+    _run_campaign_stats_rollup
 )
 
 logger = logging.getLogger(__name__)
@@ -155,6 +157,10 @@ class OutreachScheduler:
         """Run rate usage backfill."""
         return _run_rate_usage_backfill(self)
     
+    def _run_campaign_stats_rollup(self, days: int = ROLLUP_REBUILD_DAYS):
+        """Run campaign daily stats rollup."""
+        return _run_campaign_stats_rollup(self, days)
+    
     def _get_sequence_engine(self):
         """Get sequence engine instance (lazy initialization)."""
         if self.sequence_engine is None:
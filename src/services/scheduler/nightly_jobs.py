@@ -5,12 +5,14 @@ This module contains functionality for:
 - Nightly job scheduling
 - Conversation ID backfill
 - Rate usage backfill
+- Campaign daily stats rollup
 - Maintenance tasks
 """
 
 import logging
 from datetime import datetime, date, timedelta
 from src.models import db, Lead, LinkedInAccount, Event
+from src.models.campaign_daily_stat import ROLLUP_REBUILD_DAYS
 from src.services.unipile_client import UnipileClient
 
 logger = logging.getLogger(__name__)
@@ -38,6 +40,9 @@ def _maybe_run_nightly_backfills(self):
         # Run rate usage backfill
         self._run_rate_usage_backfill()
         
+        # Rebuild campaign daily stats for recently closed days
+        self._run_campaign_stats_rollup()
+        
         # Update last run dates
         self._last_conversation_backfill_date = today
         self._last_rate_usage_backfill_date = today
@@ -173,3 +178,28 @@ def _run_rate_usage_backfill(self):
     except Exception as e:
         logger.error(f"Error in rate usage backfill: {str(e)}")
         db.session.rollback()
+
+
+def _run_campaign_stats_rollup(self, days: int = ROLLUP_REBUILD_DAYS):
+    """Rebuild the campaign daily stats rollup for the last N closed days.
+    
+    Recent days are rebuilt on every run so events that arrive late (e.g.
+    delayed webhooks) are picked up by the rollup.
+    
+    Returns the number of rollup rows written, or None if the rollup failed.
+    """
+    try:
+        logger.info("Starting campaign daily stats rollup")
+        
+        from src.models.campaign_daily_stat import CampaignDailyStat
+        
+        today = date.today()
+        rows = CampaignDailyStat.refresh(today - timedelta(days=days), today)
+        
+        logger.info(f"Campaign daily stats rollup completed ({rows} rows)")
+        return rows
+        
+    except Exception as e:
+        logger.error(f"Error in campaign daily stats rollup: {str(e)}")
+        db.session.rollback()
+        return None
@@ -1,14 +1,29 @@
 import os
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from sqlalchemy import func, and_
+from flask import current_app
+from sqlalchemy import func, and_, select
 import resend
 from src.extensions import db
 from src.models import Client, Campaign, Lead, Event, LinkedInAccount
+from src.utils.lead_statuses import (
+    NEW_LEAD_STATUSES,
+    CONNECTED_STATUSES,
+    count_statuses,
+)
+from src.config import STREAM_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Reports are dominated by Resend round trips, so a few workers overlap them
+WEEKLY_REPORT_WORKERS = 8
+
+
 class WeeklyStatisticsService:
     """Service for generating and sending weekly client statistics."""
     
@@ -23,6 +38,22 @@ class WeeklyStatisticsService:
         else:
             logger.warning("No Resend API key found - weekly statistics will be disabled")
             self.enabled = False
+        
+        # Shared across report workers so parallel sends respect Resend's rate limit
+        self.max_sends_per_second = float(os.environ.get('RESEND_MAX_SENDS_PER_SECOND', '2'))
+        self._send_lock = threading.Lock()
+        self._next_send_at = 0.0
+    
+    def _wait_for_send_slot(self):
+        """Block until the next Resend send is allowed by the shared rate limit."""
+        if self.max_sends_per_second <= 0:
+            return
+        with self._send_lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_send_at)
+            self._next_send_at = send_at + 1.0 / self.max_sends_per_second
+        if send_at > now:
+            time.sleep(send_at - now)
     
     def generate_client_statistics(self, client_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """Generate comprehensive statistics for a client."""
@@ -38,8 +69,15 @@ class WeeklyStatisticsService:
             
             if not campaign_ids:
                 return {
-                    'client': client,
-                    'period': {'start': start_date, 'end': end_date},
+                    'client': {
+                        'id': client.id,
+                        'name': client.name,
+                        'email': client.email
+                    },
+                    'period': {
+                        'start': start_date.isoformat(),
+                        'end': end_date.isoformat()
+                    },
                     'campaigns': [],
                     'summary': {
                         'total_leads': 0,
@@ -48,29 +86,73 @@ class WeeklyStatisticsService:
                         'replies': 0,
                         'messages_sent': 0,
                         'conversion_rate': 0.0
+                    },
+                    'recent_activity': {
+                        'new_leads': 0,
+                        'new_events': 0,
+                        'recent_replies': 0,
+                        'recent_connections': 0
                     }
                 }
             
-            # Get leads for this period
-            leads = Lead.query.filter(
+            # Get leads for this period (only the columns the report reads)
+            period_leads = (
                 Lead.campaign_id.in_(campaign_ids),
                 Lead.created_at >= start_date,
                 Lead.created_at <= end_date
-            ).all()
+            )
+            leads = db.session.query(
+                Lead.id,
+                Lead.campaign_id,
+                Lead.status,
+                Lead.created_at
+            ).filter(*period_leads).yield_per(STREAM_BATCH_SIZE)
             
-            # Get events for this period
-            events = Event.query.filter(
-                Event.lead_id.in_([l.id for l in leads]),
+            # Count lead statuses overall and per campaign in a single pass,
+            # remembering each lead's campaign for the event tally below
+            recent_start = end_date - timedelta(days=7)
+            status_counts = Counter()
+            campaign_status_counts = defaultdict(Counter)
+            lead_campaign_ids = {}
+            recent_new_leads = 0
+            for lead in leads:
+                status_counts[lead.status] += 1
+                campaign_status_counts[lead.campaign_id][lead.status] += 1
+                lead_campaign_ids[lead.id] = lead.campaign_id
+                if lead.created_at >= recent_start:
+                    recent_new_leads += 1
+            
+            # Stream events for this period (only the columns that are counted);
+            # they are only tallied, so they never need to be held at once
+            events = db.session.query(
+                Event.lead_id,
+                Event.event_type,
+                Event.timestamp
+            ).filter(
+                Event.lead_id.in_(select(Lead.id).where(*period_leads)),
                 Event.timestamp >= start_date,
                 Event.timestamp <= end_date
-            ).all()
+            ).yield_per(STREAM_BATCH_SIZE)
             
             # Calculate statistics
-            total_leads = len(leads)
-            new_leads = len([l for l in leads if l.status in ['pending_invite', 'invite_sent', 'invited']])
-            connections = len([l for l in leads if l.status in ['connected', 'messaged', 'responded', 'completed']])
-            replies = len([e for e in events if e.event_type == 'message_received'])
-            messages_sent = len([e for e in events if e.event_type == 'message_sent'])
+            total_leads = sum(status_counts.values())
+            new_leads = count_statuses(status_counts, NEW_LEAD_STATUSES)
+            connections = count_statuses(status_counts, CONNECTED_STATUSES)
+            
+            # Count events per type overall, per campaign and for the recent
+            # window in a single pass; each event is resolved to its campaign
+            # through a lead_id lookup
+            event_counts = Counter()
+            campaign_event_counts = defaultdict(Counter)
+            recent_event_counts = Counter()
+            for event in events:
+                event_counts[event.event_type] += 1
+                campaign_event_counts[lead_campaign_ids.get(event.lead_id)][event.event_type] += 1
+                if event.timestamp >= recent_start:
+                    recent_event_counts[event.event_type] += 1
+            
+            replies = event_counts['message_received']
+            messages_sent = event_counts['message_sent']
             
             # Calculate conversion rate
             conversion_rate = (connections / total_leads * 100) if total_leads > 0 else 0.0
@@ -78,8 +160,10 @@ class WeeklyStatisticsService:
             # Campaign-specific statistics
             campaign_stats = []
             for campaign in campaigns:
-                campaign_leads = [l for l in leads if l.campaign_id == campaign.id]
-                campaign_events = [e for e in events if e.lead_id in [l.id for l in campaign_leads]]
+                campaign_statuses = campaign_status_counts.get(campaign.id, Counter())
+                campaign_events = campaign_event_counts.get(campaign.id, Counter())
+                campaign_total = sum(campaign_statuses.values())
+                campaign_connections = count_statuses(campaign_statuses, CONNECTED_STATUSES)
                 
                 campaign_stat = {
                     'campaign': {
@@ -87,20 +171,15 @@ class WeeklyStatisticsService:
                         'name': campaign.name,
                         'status': campaign.status
                     },
-                    'total_leads': len(campaign_leads),
-                    'new_leads': len([l for l in campaign_leads if l.status in ['pending_invite', 'invite_sent', 'invited']]),
-                    'connections': len([l for l in campaign_leads if l.status in ['connected', 'messaged', 'responded', 'completed']]),
-                    'replies': len([e for e in campaign_events if e.event_type == 'message_received']),
-                    'messages_sent': len([e for e in campaign_events if e.event_type == 'message_sent']),
-                    'conversion_rate': (len([l for l in campaign_leads if l.status in ['connected', 'messaged', 'responded', 'completed']]) / len(campaign_leads) * 100) if campaign_leads else 0.0
+                    'total_leads': campaign_total,
+                    'new_leads': count_statuses(campaign_statuses, NEW_LEAD_STATUSES),
+                    'connections': campaign_connections,
+                    'replies': campaign_events['message_received'],
+                    'messages_sent': campaign_events['message_sent'],
+                    'conversion_rate': (campaign_connections / campaign_total * 100) if campaign_total else 0.0
                 }
                 campaign_stats.append(campaign_stat)
             
-            # Recent activity (last 7 days)
-            recent_start = end_date - timedelta(days=7)
-            recent_leads = [l for l in leads if l.created_at >= recent_start]
-            recent_events = [e for e in events if e.timestamp >= recent_start]
-            
             return {
                 'client': {
                     'id': client.id,
@@ -121,10 +200,10 @@ class WeeklyStatisticsService:
                     'conversion_rate': conversion_rate
                 },
                 'recent_activity': {
-                    'new_leads': len(recent_leads),
-                    'new_events': len(recent_events),
-                    'recent_replies': len([e for e in recent_events if e.event_type == 'message_received']),
-                    'recent_connections': len([e for e in recent_events if e.event_type == 'connection_accepted'])
+                    'new_leads': recent_new_leads,
+                    'new_events': sum(recent_event_counts.values()),
+                    'recent_replies': recent_event_counts['message_received'],
+                    'recent_connections': recent_event_counts['connection_accepted']
                 }
             }
             
@@ -151,13 +230,14 @@ class WeeklyStatisticsService:
             
             # Get recipient email
             if not recipient_email:
-                recipient_email = stats['client'].email or f"client-{client_id}@example.com"
+                recipient_email = stats['client']['email'] or f"client-{client_id}@example.com"
             
             # Create email content
-            subject = f"📊 Weekly Report: {stats['client'].name} ({start_date.strftime('%b %d')} - {end_date.strftime('%b %d')})"
+            subject = f"📊 Weekly Report: {stats['client']['name']} ({start_date.strftime('%b %d')} - {end_date.strftime('%b %d')})"
             html_content = self._create_weekly_report_template(stats)
             
             # Send email
+            self._wait_for_send_slot()
             response = resend.Emails.send({
                 "from": self.from_email,
                 "to": recipient_email,
@@ -179,13 +259,20 @@ class WeeklyStatisticsService:
             return {}
         
         try:
-            # Get all active clients
-            clients = Client.query.filter_by(status='active').all()
+            # Get all clients (clients have no status column to filter on)
+            clients = db.session.query(Client.id, Client.email).all()
+            app = current_app._get_current_object()
+            
+            def send_report(client):
+                # Each worker gets its own app context and therefore its own session
+                with app.app_context():
+                    return self.send_weekly_report(client.id, client.email)
             
-            results = {}
-            for client in clients:
-                success = self.send_weekly_report(client.id, client.email)
-                results[client.id] = success
+            with ThreadPoolExecutor(max_workers=WEEKLY_REPORT_WORKERS) as pool:
+                results = dict(zip(
+                    (client.id for client in clients),
+                    pool.map(send_report, clients)
+                ))
             
             logger.info(f"Sent weekly reports to {len(clients)} clients: {sum(results.values())} successful")
             return results
@@ -203,8 +290,8 @@ class WeeklyStatisticsService:
         period = stats['period']
         
         # Format dates
-        start_str = period['start'].strftime('%B %d, %Y')
-        end_str = period['end'].strftime('%B %d, %Y')
+        start_str = datetime.fromisoformat(period['start']).strftime('%B %d, %Y')
+        end_str = datetime.fromisoformat(period['end']).strftime('%B %d, %Y')
         
         # Create campaign rows
         campaign_rows = ""
@@ -213,8 +300,8 @@ class WeeklyStatisticsService:
             campaign_rows += f"""
             <tr>
                 <td style="padding: 12px; border-bottom: 1px solid #eee;">
-                    <strong>{campaign.name}</strong><br>
-                    <small style="color: #666;">{campaign.status}</small>
+                    <strong>{campaign['name']}</strong><br>
+                    <small style="color: #666;">{campaign['status']}</small>
                 </td>
                 <td style="padding: 12px; border-bottom: 1px solid #eee; text-align: center;">{campaign_stat['total_leads']}</td>
                 <td style="padding: 12px; border-bottom: 1px solid #eee; text-align: center;">{campaign_stat['connections']}</td>
@@ -248,7 +335,7 @@ class WeeklyStatisticsService:
             <div class="container">
                 <div class="header">
                     <h1>📊 Weekly LinkedIn Automation Report</h1>
-                    <p><strong>{client.name}</strong> • {start_str} - {end_str}</p>
+                    <p><strong>{client['name']}</strong> • {start_str} - {end_str}</p>
                 </div>
                 
                 <div class="content">
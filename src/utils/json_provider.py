@@ -0,0 +1,30 @@
+"""
+orjson-backed JSON provider for the Flask application.
+
+This module provides a drop-in replacement for Flask's default JSON provider
+so every jsonify() response is serialized with orjson.
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize responses with orjson while keeping Flask's output format."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        """Serialize data as JSON with orjson.
+
+        Dates and datetimes are passed through to Flask's default handler so
+        they keep the HTTP date format jsonify has always produced.
+        """
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize JSON data from a string or bytes with orjson."""
+        return orjson.loads(s)
@@ -0,0 +1,19 @@
+"""
+Lead status groups shared by the analytics routes and reporting services.
+
+This module contains:
+- The lead statuses that count towards each funnel stage
+- Counting helpers over per-status lead counts
+"""
+
+# Lead statuses that count towards each funnel stage
+NEW_LEAD_STATUSES = frozenset({'pending_invite', 'invite_sent', 'invited'})
+INVITED_STATUSES = frozenset({'invite_sent', 'invited'})
+CONNECTED_STATUSES = frozenset({'connected', 'messaged', 'responded', 'completed'})
+MESSAGED_STATUSES = frozenset({'messaged', 'responded', 'completed'})
+RESPONDED_STATUSES = frozenset({'responded', 'completed'})
+
+
+def count_statuses(status_counts, statuses):
+    """Sum the lead counts of the given statuses."""
+    return sum(status_counts.get(status, 0) for status in statuses)
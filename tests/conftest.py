@@ -74,6 +74,36 @@ def db_session(app):
     with app.app_context():
         yield db.session
 
+class FakeRedis:
+    """In-memory stand-in for the Redis commands the cache service uses."""
+
+    def __init__(self):
+        self.values = {}
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+@pytest.fixture
+def cache_service(monkeypatch):
+    """A real CacheService backed by FakeRedis, used by cache_response."""
+    from src.services import caching
+
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(caching.redis, 'from_url', lambda url, **kwargs: fake_redis)
+    service = caching.CacheService('redis://test')
+    monkeypatch.setattr(caching, 'get_cache_service', lambda: service)
+    return service
+
 @pytest.fixture
 def sample_client(db_session):
     """Create a sample client for testing."""
@@ -0,0 +1,721 @@
+"""
+Unit tests for Analytics endpoints.
+
+This module tests the analytics routes against a real (SQLite) database,
+covering campaign summaries, timeseries, exports and rate usage.
+"""
+
+import uuid
+from datetime import datetime, date, timedelta
+
+from src.models import Campaign, Lead, Event, RateUsage, CampaignDailyStat
+
+
+class TestAccountRateUsage:
+    """Test cases for the account rate usage endpoint."""
+
+    def test_rate_usage_from_usage_records(self, client, db_session):
+        """Daily usage is read from the rate_usage table."""
+        db_session.add(RateUsage(
+            id=str(uuid.uuid4()),
+            linkedin_account_id='acct-1',
+            usage_date=date.today(),
+            invites_sent=3,
+            messages_sent=4
+        ))
+        db_session.commit()
+
+        response = client.get('/api/v1/analytics/accounts/acct-1/rate-usage?days=7')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['daily_usage']) == 7
+        assert data['daily_usage'][-1] == {
+            'date': date.today().isoformat(),
+            'connections_sent': 3,
+            'messages_sent': 4,
+            'total_actions': 7
+        }
+        assert data['totals'] == {
+            'total_connections': 3,
+            'total_messages': 4,
+            'total_actions': 7
+        }
+
+    def test_rate_usage_falls_back_to_events(self, client, db_session, sample_lead):
+        """Without usage rows, counts are derived from the account's events."""
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='connection_request_sent',
+                  timestamp=now, meta_json={'linkedin_account_id': 'acct-1'}),
+            Event(lead_id=sample_lead.id, event_type='message_sent',
+                  timestamp=now, meta_json={'linkedin_account_id': 'acct-1'}),
+            Event(lead_id=sample_lead.id, event_type='message_sent',
+                  timestamp=now, meta_json={'linkedin_account_id': 'acct-2'}),
+            Event(lead_id=sample_lead.id, event_type='message_sent',
+                  timestamp=now, meta_json=None),
+        ])
+        db_session.commit()
+
+        response = client.get('/api/v1/analytics/accounts/acct-1/rate-usage?days=3')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['totals'] == {
+            'total_connections': 1,
+            'total_messages': 1,
+            'total_actions': 2
+        }
+
+
+class TestCampaignSummary:
+    """Test cases for the campaign summary endpoint."""
+
+    def test_response_times_pair_replies_per_lead(self, client, db_session, sample_campaign, sample_lead):
+        """Each sent message is paired with the same lead's next reply."""
+        other_lead = Lead(
+            campaign_id=sample_campaign.id,
+            public_identifier='jane-roe-456',
+            status='messaged'
+        )
+        db_session.add(other_lead)
+        db_session.commit()
+
+        sent_at = datetime.utcnow() - timedelta(days=2)
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=sent_at),
+            Event(lead_id=sample_lead.id, event_type='message_received',
+                  timestamp=sent_at + timedelta(hours=3)),
+            Event(lead_id=other_lead.id, event_type='message_sent', timestamp=sent_at),
+            Event(lead_id=sample_lead.id, event_type='message_received',
+                  timestamp=sent_at + timedelta(hours=1)),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/summary')
+
+        assert response.status_code == 200
+        response_analysis = response.get_json()['time_analytics']['response_analysis']
+        assert response_analysis['total_responses'] == 1
+        assert response_analysis['average_response_time_hours'] == 1.0
+        assert response_analysis['response_rate'] == 50.0
+
+    def test_status_breakdown(self, client, db_session, sample_campaign, sample_lead):
+        """Lead statuses are counted per status."""
+        db_session.add_all([
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-a', status='connected'),
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-b', status='connected'),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/summary')
+
+        assert response.status_code == 200
+        overview = response.get_json()['overview']
+        assert overview['total_leads'] == 3
+        assert overview['status_breakdown'] == {'pending_invite': 1, 'connected': 2}
+
+    def test_funnel_and_predictions_from_status_counts(self, client, db_session, sample_campaign, sample_lead):
+        """Funnel stages and predictions are derived from the lead status counts."""
+        db_session.add_all([
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-a', status='connected'),
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-b', status='responded'),
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-c', status='completed'),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/summary')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['conversion_funnel']['funnel_stages'] == {
+            'total_leads': 4,
+            'invites_sent': 0,
+            'connected': 3,
+            'messaged': 2,
+            'responded': 2,
+            'completed': 1
+        }
+        performance = data['predictive_analytics']['performance_metrics']
+        assert performance['connection_rate'] == 75.0
+        assert performance['response_rate'] == 50.0
+        assert performance['current_completions'] == 2
+
+    def test_funnel_only_counts_recent_leads(self, client, db_session, sample_campaign, sample_lead):
+        """Older leads appear in the status breakdown but not in the 30-day funnel."""
+        db_session.add(Lead(campaign_id=sample_campaign.id, public_identifier='lead-old', status='connected',
+                            created_at=datetime.utcnow() - timedelta(days=60)))
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/summary')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['overview']['status_breakdown'] == {'pending_invite': 1, 'connected': 1}
+        assert data['conversion_funnel']['funnel_stages']['total_leads'] == 1
+        assert data['conversion_funnel']['funnel_stages']['connected'] == 0
+
+    def test_time_analytics_without_sent_messages(self, client, db_session, sample_campaign, sample_lead):
+        """Replies without any sent message yield a zero response rate."""
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_received',
+                             timestamp=datetime.utcnow()))
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/summary')
+
+        assert response.status_code == 200
+        time_analytics = response.get_json()['time_analytics']
+        assert time_analytics['response_analysis']['response_rate'] == 0
+        assert sum(time_analytics['hourly_analysis']['hourly_replies'].values()) == 1
+
+    def test_time_analytics_without_replies(self, client, db_session, sample_campaign, sample_lead):
+        """Sent messages without any reply report no responses."""
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent',
+                             timestamp=datetime.utcnow()))
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/summary')
+
+        assert response.status_code == 200
+        time_analytics = response.get_json()['time_analytics']
+        assert time_analytics['hourly_analysis'] == {'hourly_replies': {}, 'optimal_sending_hours': []}
+        assert time_analytics['response_analysis'] == {
+            'average_response_time_hours': 0,
+            'total_responses': 0,
+            'response_rate': 0
+        }
+
+    def test_hourly_replies_counted_per_hour(self, client, db_session, sample_campaign, sample_lead):
+        """Replies are counted per hour of day and ranked into optimal hours."""
+        day = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_received', timestamp=day.replace(hour=9)),
+            Event(lead_id=sample_lead.id, event_type='message_received', timestamp=day.replace(hour=9, minute=30)),
+            Event(lead_id=sample_lead.id, event_type='message_received', timestamp=day.replace(hour=14)),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=day.replace(hour=8)),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/summary')
+
+        assert response.status_code == 200
+        hourly_analysis = response.get_json()['time_analytics']['hourly_analysis']
+        assert hourly_analysis['hourly_replies'] == {'9': 2, '14': 1}
+        assert hourly_analysis['optimal_sending_hours'] == [9, 14]
+
+
+class TestCampaignTimeseries:
+    """Test cases for the campaign timeseries endpoint."""
+
+    def test_timeseries_buckets_events_by_day(self, client, db_session, sample_campaign, sample_lead):
+        """Events are counted per day and per event type."""
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now),
+            Event(lead_id=sample_lead.id, event_type='message_received', timestamp=now),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/timeseries?days=3')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        timeseries = response.get_json()['timeseries_data']
+        assert [day['date'] for day in timeseries] == [
+            (date.today() - timedelta(days=offset)).isoformat() for offset in (2, 1, 0)
+        ]
+        assert timeseries[-1]['total_events'] == 3
+        assert timeseries[-1]['event_breakdown'] == {'message_sent': 2, 'message_received': 1}
+        assert timeseries[0]['total_events'] == 0
+
+    def test_timeseries_cached_per_query_string(self, client, db_session, sample_campaign, sample_lead, cache_service):
+        """Cached timeseries responses are keyed by campaign and query parameters."""
+        url = f'/api/v1/analytics/campaigns/{sample_campaign.id}/timeseries'
+
+        week = client.get(f'{url}?days=7')
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=datetime.utcnow()))
+        db_session.commit()
+        cached_week = client.get(f'{url}?days=7')
+        fortnight = client.get(f'{url}?days=14')
+
+        keys = list(cache_service.redis_client.values)
+        assert len(keys) == 2
+        assert all(key.startswith(f'api:analytics:campaign_timeseries:{sample_campaign.id}:') for key in keys)
+        assert cached_week.get_json() == week.get_json()
+        assert len(fortnight.get_json()['timeseries_data']) == 14
+        assert fortnight.get_json()['timeseries_data'][-1]['total_events'] == 1
+
+    def test_timeseries_reads_rolled_up_days(self, client, db_session, sample_campaign, sample_lead):
+        """Rolled-up days come from campaign_daily_stats, the rest from events."""
+        now = datetime.utcnow()
+        yesterday = now - timedelta(days=1)
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=yesterday),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=yesterday),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now),
+        ])
+        db_session.commit()
+
+        CampaignDailyStat.refresh(date.today() - timedelta(days=1))
+        rollup = CampaignDailyStat.query.filter_by(campaign_id=sample_campaign.id).all()
+        assert [(stat.day, stat.event_type, stat.n) for stat in rollup] == [
+            (yesterday.date(), 'message_sent', 2)
+        ]
+
+        # Later events for a rolled-up day are only seen after the next refresh
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=yesterday))
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/timeseries?days=3')
+
+        assert response.status_code == 200
+        timeseries = response.get_json()['timeseries_data']
+        assert [day['total_events'] for day in timeseries] == [0, 2, 1]
+
+
+    def test_timeseries_counts_days_past_rebuild_window_live(self, client, db_session, sample_campaign, sample_lead):
+        """Rollup rows older than the nightly rebuild window are ignored in favour of live counts."""
+        from src.models.campaign_daily_stat import ROLLUP_REBUILD_DAYS
+
+        old_day = datetime.utcnow() - timedelta(days=ROLLUP_REBUILD_DAYS + 2)
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=old_day))
+        db_session.commit()
+        CampaignDailyStat.refresh(old_day.date())
+
+        # A late event for a day the nightly job no longer rebuilds
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=old_day))
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/timeseries?days=14')
+
+        assert response.status_code == 200
+        by_date = {day['date']: day['total_events'] for day in response.get_json()['timeseries_data']}
+        assert by_date[old_day.date().isoformat()] == 2
+
+    def test_live_days_merged_into_timestamp_ranges(self):
+        """Consecutive live days become one [start, end) range; gaps start a new one."""
+        from src.routes.analytics.core import _day_windows
+
+        day = date(2024, 1, 10)
+        windows = _day_windows([day + timedelta(days=offset) for offset in (3, 0, 1, 5)])
+
+        assert windows == [
+            (datetime(2024, 1, 10), datetime(2024, 1, 12)),
+            (datetime(2024, 1, 13), datetime(2024, 1, 14)),
+            (datetime(2024, 1, 15), datetime(2024, 1, 16)),
+        ]
+
+    def test_delete_campaign_removes_rollup_rows(self, client, db_session, sample_campaign, sample_lead):
+        """Deleting a rolled-up campaign also deletes its campaign_daily_stats rows."""
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=yesterday))
+        db_session.commit()
+        CampaignDailyStat.refresh(date.today() - timedelta(days=1))
+        campaign_id = sample_campaign.id
+
+        response = client.delete(f'/api/v1/campaigns/{campaign_id}')
+
+        assert response.status_code == 200
+        assert CampaignDailyStat.query.filter_by(campaign_id=campaign_id).count() == 0
+        assert db_session.get(Campaign, campaign_id) is None
+        foreign_key, = CampaignDailyStat.__table__.c.campaign_id.foreign_keys
+        assert foreign_key.ondelete == 'CASCADE'
+
+
+class TestFirstLevelConnections:
+    """Test cases for the first-level connections analytics endpoint."""
+
+    def test_metrics_only_count_first_level_leads(self, client, db_session, sample_campaign, sample_lead):
+        """Only leads imported from 1st-level connections are counted."""
+        first_level = {'source': 'first_level_connections'}
+        connected = Lead(campaign_id=sample_campaign.id, public_identifier='lead-a',
+                         status='connected', meta_json=first_level)
+        responded = Lead(campaign_id=sample_campaign.id, public_identifier='lead-b',
+                         status='responded', meta_json=first_level)
+        db_session.add_all([connected, responded])
+        db_session.commit()
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=responded.id, event_type='message_received', timestamp=now),
+            Event(lead_id=sample_lead.id, event_type='message_received', timestamp=now),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/first-level-connections')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['metrics'] == {
+            'total_first_level_leads': 2,
+            'connected_first_level': 2,
+            'responded_first_level': 1,
+            'connection_rate': 100.0,
+            'response_rate': 50.0
+        }
+        assert [event['lead_id'] for event in data['recent_events']] == [responded.id]
+
+
+class TestCampaignExport:
+    """Test cases for the campaign CSV export endpoint."""
+
+    def test_export_leads_csv(self, client, db_session, sample_campaign, sample_lead):
+        """Lead timestamps come from the lead's latest events of each type."""
+        invited_at = datetime(2024, 1, 1, 9, 0)
+        connected_at = datetime(2024, 1, 2, 9, 0)
+        messaged_at = datetime(2024, 1, 3, 9, 0)
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='invite_sent', timestamp=invited_at - timedelta(hours=1)),
+            Event(lead_id=sample_lead.id, event_type='connection_request_sent', timestamp=invited_at),
+            Event(lead_id=sample_lead.id, event_type='connection_accepted', timestamp=connected_at),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=messaged_at - timedelta(hours=1)),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=messaged_at),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/export/csv?type=leads')
+
+        assert response.status_code == 200
+        rows = response.get_data(as_text=True).splitlines()
+        assert len(rows) == 2
+        assert rows[1].split(',')[-3:] == [
+            connected_at.isoformat(),
+            messaged_at.isoformat(),
+            invited_at.isoformat()
+        ]
+
+    def test_export_leads_csv_blank_names(self, client, db_session, sample_campaign):
+        """Leads without names are exported with empty name columns."""
+        lead = Lead(campaign_id=sample_campaign.id, public_identifier='anonymous', status='pending_invite')
+        db_session.add(lead)
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/export/csv?type=leads')
+
+        assert response.status_code == 200
+        rows = response.get_data(as_text=True).splitlines()
+        assert rows[1].split(',')[:8] == [lead.id, '', '', '', 'anonymous', 'pending_invite', '', '0']
+
+    def test_export_events_csv(self, client, db_session, sample_campaign, sample_lead):
+        """Events are exported newest first, one row per event."""
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_sent',
+                  timestamp=now - timedelta(hours=1)),
+            Event(lead_id=sample_lead.id, event_type='message_received',
+                  timestamp=now, meta_json={'text': 'hi'}),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/export/csv?type=events')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        rows = response.get_data(as_text=True).splitlines()
+        assert rows[0] == 'Event ID,Lead ID,Event Type,Timestamp,Meta JSON'
+        assert len(rows) == 3
+        assert rows[1].split(',')[1:3] == [sample_lead.id, 'message_received']
+        assert rows[2].split(',')[1:3] == [sample_lead.id, 'message_sent']
+        assert rows[1].endswith(',"{""text"": ""hi""}"')
+        assert rows[2].endswith(',')
+
+    def test_export_streams_in_chunks(self, client, db_session, sample_campaign, sample_lead, monkeypatch):
+        """CSV exports are streamed and split into chunks as the buffer fills."""
+        from src.routes.analytics import export_analytics
+        monkeypatch.setattr(export_analytics, 'CSV_STREAM_CHUNK_SIZE', 1)
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now - timedelta(minutes=offset))
+            for offset in range(3)
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/export/csv?type=events',
+                              buffered=False)
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.headers['Content-Disposition'].startswith('attachment; filename=')
+        chunks = list(response.response)
+        assert len(chunks) > 1
+        assert len(b''.join(chunks).decode().splitlines()) == 4
+        response.close()
+
+    def test_export_gzip_when_accepted(self, client, db_session, sample_campaign, sample_lead):
+        """Clients that accept gzip get a compressed CSV body."""
+        import gzip
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=datetime.utcnow()))
+        db_session.commit()
+
+        plain = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/export/csv?type=events')
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/export/csv?type=events',
+                              headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in plain.headers
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(response.data) == plain.data
+
+    def test_export_analytics_csv(self, client, db_session, sample_campaign, sample_lead):
+        """Leads are counted per creation day towards each funnel column."""
+        db_session.add_all([
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-a', status='invite_sent'),
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-b', status='messaged'),
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-c', status='completed'),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/campaigns/{sample_campaign.id}/export/csv?type=analytics')
+
+        assert response.status_code == 200
+        rows = response.get_data(as_text=True).splitlines()
+        assert rows[0] == ('Date,New Leads,Invites Sent,Connections Made,'
+                           'Messages Sent,Responses Received,Completions')
+        assert rows[1:] == [f'{date.today().isoformat()},4,1,2,2,1,1']
+
+
+class TestComparativeAnalytics:
+    """Test cases for the comparative analytics endpoints."""
+
+    def test_client_comparative_counts_per_campaign(self, client, db_session, sample_client, sample_campaign, sample_lead):
+        """Campaign and client-wide metrics come from the same status counts."""
+        other_campaign = Campaign(client_id=sample_client.id, name='Other Campaign', status='draft')
+        db_session.add(other_campaign)
+        db_session.commit()
+        db_session.add_all([
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-a', status='responded'),
+            Lead(campaign_id=other_campaign.id, public_identifier='lead-b', status='connected'),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/clients/{sample_client.id}/comparative-analytics')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        metrics = {item['campaign_id']: item['metrics'] for item in data['campaign_analytics']}
+        assert metrics[sample_campaign.id] == {
+            'total_leads': 2,
+            'connected_leads': 1,
+            'responded_leads': 1,
+            'connection_rate': 50.0,
+            'response_rate': 50.0
+        }
+        assert metrics[other_campaign.id]['connected_leads'] == 1
+        summary = data['client_summary']
+        assert summary['total_campaigns'] == 2
+        assert summary['total_leads'] == 3
+        assert summary['total_connected'] == 2
+        assert summary['overall_response_rate'] == 33.33
+
+    def test_system_comparative_ranks_by_response_rate(self, client, db_session, sample_client, sample_campaign, sample_lead):
+        """Campaigns are ranked by response rate and limited."""
+        other_campaign = Campaign(client_id=sample_client.id, name='Other Campaign', status='draft')
+        db_session.add(other_campaign)
+        db_session.commit()
+        db_session.add(Lead(campaign_id=other_campaign.id, public_identifier='lead-a', status='responded'))
+        db_session.commit()
+
+        response = client.get('/api/v1/analytics/comparative/campaigns?limit=1')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [item['campaign_id'] for item in data['top_performing_campaigns']] == [other_campaign.id]
+        assert data['system_summary']['total_campaigns'] == 2
+        assert data['system_summary']['total_leads'] == 2
+        assert data['system_summary']['total_responded'] == 1
+        assert data['top_performing_campaigns'][0]['metrics'] == {
+            'total_leads': 1,
+            'connected_leads': 1,
+            'responded_leads': 1,
+            'connection_rate': 100.0,
+            'response_rate': 100.0
+        }
+
+    def test_system_comparative_includes_campaigns_without_leads(self, client, db_session, sample_client, sample_campaign, sample_lead):
+        """Campaigns without leads in the window are still ranked, with zero metrics."""
+        idle_campaign = Campaign(client_id=sample_client.id, name='Idle Campaign', status='draft')
+        db_session.add(idle_campaign)
+        db_session.commit()
+
+        response = client.get('/api/v1/analytics/comparative/campaigns')
+
+        assert response.status_code == 200
+        ranked = response.get_json()['top_performing_campaigns']
+        assert [item['campaign_id'] for item in ranked] == [sample_campaign.id, idle_campaign.id]
+        assert ranked[1]['metrics']['total_leads'] == 0
+        assert ranked[1]['metrics']['response_rate'] == 0
+
+
+class TestRealTimeActivity:
+    """Test cases for the real-time activity endpoint."""
+
+    def test_real_time_activity_lists_leads_and_campaigns(self, client, db_session, sample_campaign, sample_lead):
+        """Recent leads and active campaigns are reported with their key fields."""
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=datetime.utcnow()))
+        db_session.commit()
+
+        response = client.get('/api/v1/analytics/real-time/activity')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['activity_summary'] == {
+            'total_events': 1,
+            'total_new_leads': 1,
+            'total_active_campaigns': 1
+        }
+        assert data['recent_leads'][0]['id'] == sample_lead.id
+        assert data['recent_leads'][0]['campaign_id'] == sample_campaign.id
+        assert data['active_campaigns'] == [{
+            'id': sample_campaign.id,
+            'name': 'Test Campaign',
+            'client_id': sample_campaign.client_id,
+            'status': 'active'
+        }]
+        assert data['events_by_campaign'] == [{'campaign_name': 'Test Campaign', 'event_count': 1}]
+
+
+    def test_events_by_campaign_ranked_by_recent_events(self, client, db_session, sample_campaign, sample_lead):
+        """Campaigns are ranked by event count within the window, busiest first."""
+        other_campaign = Campaign(client_id=sample_campaign.client_id, name='Other Campaign', status='draft')
+        db_session.add(other_campaign)
+        db_session.commit()
+        other_lead = Lead(campaign_id=other_campaign.id, public_identifier='other-lead', status='pending_invite')
+        db_session.add(other_lead)
+        db_session.commit()
+
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now),
+            Event(lead_id=other_lead.id, event_type='message_sent', timestamp=now),
+            Event(lead_id=other_lead.id, event_type='message_received', timestamp=now),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now - timedelta(days=3)),
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now - timedelta(days=3)),
+        ])
+        db_session.commit()
+
+        response = client.get('/api/v1/analytics/real-time/activity')
+
+        assert response.status_code == 200
+        assert response.get_json()['events_by_campaign'] == [
+            {'campaign_name': 'Other Campaign', 'event_count': 2},
+            {'campaign_name': 'Test Campaign', 'event_count': 1},
+        ]
+
+
+class TestWeeklyStatistics:
+    """Test cases for the weekly statistics endpoints."""
+
+    def test_preview_groups_events_per_campaign(self, client, db_session, sample_client, sample_lead):
+        """Per-campaign statistics only count that campaign's leads and events."""
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=now),
+            Event(lead_id=sample_lead.id, event_type='message_received', timestamp=now),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/weekly-stats/preview/{sample_client.id}')
+
+        assert response.status_code == 200
+        statistics = response.get_json()['statistics']
+        assert statistics['summary']['messages_sent'] == 1
+        assert statistics['summary']['replies'] == 1
+        campaign_stat = statistics['campaigns'][0]
+        assert campaign_stat['total_leads'] == 1
+        assert campaign_stat['messages_sent'] == 1
+        assert campaign_stat['replies'] == 1
+
+    def test_preview_counts_lead_statuses(self, client, db_session, sample_client, sample_campaign, sample_lead):
+        """New leads and connections are counted from lead statuses overall and per campaign."""
+        db_session.add_all([
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-a', status='connected'),
+            Lead(campaign_id=sample_campaign.id, public_identifier='lead-b', status='responded'),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/weekly-stats/preview/{sample_client.id}')
+
+        assert response.status_code == 200
+        statistics = response.get_json()['statistics']
+        assert statistics['summary']['total_leads'] == 3
+        assert statistics['summary']['new_leads'] == 1
+        assert statistics['summary']['connections'] == 2
+        assert statistics['recent_activity']['new_leads'] == 3
+        campaign_stat = statistics['campaigns'][0]
+        assert campaign_stat['connections'] == 2
+        assert round(campaign_stat['conversion_rate'], 2) == 66.67
+
+    def test_preview_recent_activity_counts(self, client, db_session, sample_client, sample_lead):
+        """Recent activity counts every event type seen in the last week."""
+        now = datetime.utcnow()
+        db_session.add_all([
+            Event(lead_id=sample_lead.id, event_type='connection_request_sent', timestamp=now),
+            Event(lead_id=sample_lead.id, event_type='connection_accepted', timestamp=now),
+            Event(lead_id=sample_lead.id, event_type='message_received', timestamp=now),
+        ])
+        db_session.commit()
+
+        response = client.get(f'/api/v1/analytics/weekly-stats/preview/{sample_client.id}')
+
+        assert response.status_code == 200
+        recent_activity = response.get_json()['statistics']['recent_activity']
+        assert recent_activity['new_events'] == 3
+        assert recent_activity['recent_replies'] == 1
+        assert recent_activity['recent_connections'] == 1
+
+    def test_preview_served_from_cache(self, client, db_session, sample_client, sample_lead, cache_service):
+        """A cached preview is returned without regenerating the statistics."""
+        url = f'/api/v1/analytics/weekly-stats/preview/{sample_client.id}'
+
+        first = client.get(url)
+        db_session.add(Event(lead_id=sample_lead.id, event_type='message_sent', timestamp=datetime.utcnow()))
+        db_session.commit()
+        second = client.get(url)
+
+        key, = cache_service.redis_client.values
+        assert key.startswith(f'api:analytics:weekly_stats:{sample_client.id}:')
+        assert second.mimetype == 'application/json'
+        assert second.get_json() == first.get_json()
+        assert second.get_json()['statistics']['summary']['messages_sent'] == 0
+
+    def test_generate_returns_result_per_client(self, client, db_session, sample_client, sample_lead):
+        """Statistics are generated for every client."""
+        from src.models import Client
+
+        other = Client(name='Other Client', email='other@example.com')
+        db_session.add(other)
+        db_session.commit()
+
+        response = client.post('/api/v1/analytics/weekly-stats/generate', json={})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['total_clients'] == 2
+        results = {result['client_id']: result for result in data['results']}
+        assert results[sample_client.id]['status'] == 'success'
+        assert results[sample_client.id]['statistics']['summary']['total_leads'] == 1
+        assert results[other.id]['client_name'] == 'Other Client'
+
+    def test_send_all_weekly_reports_sends_per_client(self, app, db_session, sample_client, sample_campaign, monkeypatch):
+        """Every client gets a report and the results are keyed by client id."""
+        from src.models import Client
+        from src.services import weekly_statistics
+
+        other = Client(name='Other Client', email='other@example.com')
+        db_session.add(other)
+        db_session.commit()
+
+        monkeypatch.setenv('RESEND_API_KEY', 'test-resend-key')
+        monkeypatch.setenv('WEEKLY_STATS_ENABLED', 'true')
+        monkeypatch.setenv('RESEND_MAX_SENDS_PER_SECOND', '0')
+        sent_to = []
+        monkeypatch.setattr(
+            weekly_statistics.resend.Emails, 'send',
+            lambda params: sent_to.append(params['to']) or {'id': 'email-id'}
+        )
+
+        results = weekly_statistics.WeeklyStatisticsService().send_all_weekly_reports()
+
+        assert results == {sample_client.id: True, other.id: True}
+        assert sorted(sent_to) == ['other@example.com', 'test@example.com']
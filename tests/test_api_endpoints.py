@@ -87,6 +87,30 @@ class TestAuthEndpoints:
             data = json.loads(response.data)
             assert 'error' in data
 
+    def test_login_reuses_fresh_token(self, client, monkeypatch):
+        """Repeated logins reuse the signed token while it is fresh."""
+        from src.routes import auth
+        monkeypatch.setattr(auth, '_login_token', None)
+
+        first = client.post('/api/v1/auth/login', json={'api_key': 'linkedin-automation-api-key'})
+        second = client.post('/api/v1/auth/login', json={'api_key': 'linkedin-automation-api-key'})
+
+        assert first.status_code == 200
+        assert second.json['access_token'] == first.json['access_token']
+        assert 0 < second.json['expires_in'] <= 86400
+
+    def test_login_reissues_token_near_expiry(self, client, monkeypatch):
+        """A token with less than an hour left is replaced by a new one."""
+        from src.routes import auth
+        signing_key = client.application.config.get('JWT_SECRET_KEY')
+        monkeypatch.setattr(auth, '_login_token', (signing_key, 'stale-token', auth.time.time() + 60))
+
+        response = client.post('/api/v1/auth/login', json={'api_key': 'linkedin-automation-api-key'})
+
+        assert response.status_code == 200
+        assert response.json['access_token'] != 'stale-token'
+        assert response.json['expires_in'] > 86400 - 60
+
     def test_logout(self, client):
         """Test user logout."""
         with patch('src.routes.auth.jwt') as mock_jwt:
@@ -319,3 +319,25 @@ class TestJSONHelpers:
             json.loads('{"valid": "json"}')
         except json.JSONDecodeError:
             pytest.fail("Valid JSON should not raise JSONDecodeError")
+
+
+class TestOrjsonProvider:
+    """Test the orjson-backed Flask JSON provider."""
+    
+    def test_matches_default_provider_output(self, app):
+        """orjson output decodes to the same data Flask's default provider produced."""
+        from flask.json.provider import DefaultJSONProvider
+        data = {'b': 1, 'a': [1.5, None], 'hours': {3: 1, 10: 2}, 'when': datetime(2024, 1, 1, 12, 0, 0)}
+        
+        orjson_data = json.loads(app.json.dumps(data))
+        default_data = json.loads(DefaultJSONProvider(app).dumps(data))
+        
+        assert orjson_data == default_data
+        assert list(orjson_data) == ['a', 'b', 'hours', 'when']
+        assert orjson_data['when'] == 'Mon, 01 Jan 2024 12:00:00 GMT'
+    
+    def test_loads_rejects_invalid_json(self, app):
+        """Invalid JSON still raises a JSONDecodeError."""
+        assert app.json.loads(b'{"valid": "json"}') == {'valid': 'json'}
+        with pytest.raises(json.JSONDecodeError):
+            app.json.loads('{"invalid": json}')